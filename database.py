@@ -1,20 +1,195 @@
+import re
 import sqlite3
 import json
+import threading
 from datetime import datetime
-from typing import Optional, Dict, List, Any
+from functools import lru_cache
+from typing import Optional, Dict, List, Any, Iterator, Set, Callable
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_json_loads = orjson.loads if orjson else json.loads
+
+
+def _json_dumps(value: Any) -> str:
+    """Serialize a list field for storage, with orjson when it is installed."""
+    return orjson.dumps(value).decode('utf-8') if orjson else json.dumps(value)
+
+
+_PUNCTUATION_RE = re.compile(r'[^\w\s]')
+
+# Deletes the ASCII characters _PUNCTUATION_RE matches, for the str.translate fast path
+_ASCII_PUNCTUATION_TABLE = str.maketrans('', '', ''.join(
+    c for c in map(chr, range(128)) if not (c.isalnum() or c == '_' or c.isspace())
+))
+
+
+@lru_cache(maxsize=4096)
+def normalize_name(s: str) -> str:
+    """Normalize a show or theater name for duplicate checks (lowercase, no punctuation, single spaces)."""
+    # Theater names repeat across most rows, so most calls hit the cache
+    s = s.lower()
+    if s.isascii():
+        s = s.translate(_ASCII_PUNCTUATION_TABLE)
+    else:
+        s = _PUNCTUATION_RE.sub('', s)
+    return ' '.join(s.split())
+
+
+# Canonical column order for inserts. Keeping the INSERT text fixed lets
+# sqlite3's per-connection statement cache reuse one prepared statement.
+SHOW_COLUMNS = (
+    'show_name', 'theater_name', 'date_added', 'date_attended', 'seen_status',
+    'rating', 'personal_notes',
+    'lead_cast', 'director', 'choreographer', 'composer', 'lyricist', 'book_writer',
+    'opening_date', 'closing_date', 'is_revival', 'original_production_year',
+    'production_type',
+    'plot_summary', 'genre', 'tony_awards', 'other_awards',
+    'musical_numbers', 'themes', 'running_time', 'intermission_count',
+    'llm_categories', 'user_categories',
+    'source_image_path', 'last_updated',
+)
+
+# Defaults for columns with a DEFAULT clause, since the fixed INSERT
+# always binds every column.
+SHOW_COLUMN_DEFAULTS = {'is_revival': 0}
+
+# Duplicate-check keys, kept in step with their source columns on every write.
+# They are internal, so reads select SHOW_SELECT_LIST rather than *.
+NORMALIZED_COLUMNS = {'show_name_norm': 'show_name', 'theater_name_norm': 'theater_name'}
+SHOW_SELECT_LIST = ', '.join(('id',) + SHOW_COLUMNS)
+
+JSON_FIELDS = (
+    'lead_cast', 'tony_awards', 'other_awards', 'musical_numbers',
+    'themes', 'llm_categories', 'user_categories'
+)
+
+_INSERT_COLUMNS = SHOW_COLUMNS + tuple(NORMALIZED_COLUMNS)
+SQL_INSERT_SHOW = (
+    f"INSERT INTO shows ({', '.join(_INSERT_COLUMNS)}) "
+    f"VALUES ({', '.join('?' for _ in _INSERT_COLUMNS)})"
+)
+SQL_GET_SHOW = f"SELECT {SHOW_SELECT_LIST} FROM shows WHERE id = ?"
+SQL_GET_SHOW_BY_NAME = f"SELECT {SHOW_SELECT_LIST} FROM shows WHERE show_name = ?"
+SQL_GET_SHOW_BY_NAME_AND_THEATER = f"SELECT {SHOW_SELECT_LIST} FROM shows WHERE show_name = ? AND theater_name = ?"
+# Served by idx_shows_normalized; the newest matching show wins
+SQL_FIND_BY_NORMALIZED = (
+    f"SELECT {SHOW_SELECT_LIST} FROM shows "
+    "WHERE show_name_norm = ? AND theater_name_norm = ? AND (? IS NULL OR date_attended = ?) "
+    "ORDER BY id DESC LIMIT 1"
+)
+SQL_MARK_IMAGE_PROCESSED = (
+    "INSERT OR REPLACE INTO processed_images (image_path, processed_date, shows_extracted) "
+    "VALUES (?, ?, ?)"
+)
+SQL_IS_IMAGE_PROCESSED = "SELECT 1 FROM processed_images WHERE image_path = ? LIMIT 1"
+# Prefix match as a key range, so it is served by the image_path primary key
+SQL_GET_PROCESSED_PATHS = "SELECT image_path FROM processed_images WHERE image_path >= ? AND image_path < ?"
+
+# Columns in the shows_fts full-text index
+FTS_COLUMNS = ('show_name', 'theater_name', 'genre', 'llm_categories', 'user_categories')
+
+# Text filters served by shows_fts, mapped to their column
+FTS_FILTERS = {
+    'show_name': 'show_name',
+    'theater_name': 'theater_name',
+    'genre': 'genre',
+}
+
+# Category filters served by the show_categories table, mapped to their source
+CATEGORY_FILTERS = {
+    'category': 'llm',
+    'user_category': 'user',
+}
+
+_FTS_COLUMNS = ', '.join(FTS_COLUMNS)
+_FTS_NEW_VALUES = ', '.join(f'new.{col}' for col in FTS_COLUMNS)
+_FTS_OLD_VALUES = ', '.join(f'old.{col}' for col in FTS_COLUMNS)
+
+# Explode a show's JSON category lists into show_categories rows. The
+# {show} placeholder is 'new' inside triggers or 'shows' for a backfill.
+_SQL_FILL_SHOW_CATEGORIES = """
+    INSERT OR IGNORE INTO show_categories (show_id, source, category)
+    SELECT {show}.id, 'llm', trim(cat.value)
+    FROM {from_clause} json_each(CASE WHEN json_valid({show}.llm_categories) THEN {show}.llm_categories ELSE '[]' END) AS cat
+    WHERE cat.type = 'text';
+    INSERT OR IGNORE INTO show_categories (show_id, source, category)
+    SELECT {show}.id, 'user', trim(cat.value)
+    FROM {from_clause} json_each(CASE WHEN json_valid({show}.user_categories) THEN {show}.user_categories ELSE '[]' END) AS cat
+    WHERE cat.type = 'text';
+"""
+
+# Sortable columns for search_shows. Every (column, direction) pair maps to
+# one fixed ORDER BY string so equal requests produce identical SQL text.
+ALLOWED_SORT = ('date_added', 'rating', 'show_name', 'theater_name')
+ALLOWED_ORDER = ('ASC', 'DESC')
+# Text sorts are case-insensitive and served by the matching NOCASE indexes
+_SORT_COLLATION = {'show_name': ' COLLATE NOCASE', 'theater_name': ' COLLATE NOCASE'}
+_ORDER_BY = {
+    (column, order): f" ORDER BY {column}{_SORT_COLLATION.get(column, '')} {order}"
+    for column in ALLOWED_SORT
+    for order in ALLOWED_ORDER
+}
+
+# Evaluating the MATCH in its own materialized CTE keeps SQLite from
+# dropping the FTS index when other WHERE conditions are present.
+_FTS_CTE = (
+    "WITH fts_matches AS {}(SELECT rowid FROM shows_fts WHERE shows_fts MATCH ?) ".format(
+        "MATERIALIZED " if sqlite3.sqlite_version_info >= (3, 35, 0) else ""
+    )
+)
+
+
+_IDENTIFIER_RE = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+
+def _fts_match_term(column: str, value: Any) -> Optional[str]:
+    """Build an FTS5 prefix query for one column, e.g. show_name : "wick"*."""
+    tokens = re.findall(r'\w+', str(value))
+    if not tokens:
+        return None
+    return ' AND '.join(f'{column} : "{token}"*' for token in tokens)
 
 
 class Database:
     def __init__(self, db_path: str = "shows.db"):
         self.db_path = db_path
+        self._local = threading.local()
         self.init_db()
 
-    def get_connection(self):
-        """Get database connection."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+    def get_connection(self) -> sqlite3.Connection:
+        """Get this thread's database connection, opening it on first use."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path)
+            conn.row_factory = sqlite3.Row
+            self._configure_connection(conn)
+            self._local.conn = conn
         return conn
 
+    @property
+    def conn(self) -> sqlite3.Connection:
+        return self.get_connection()
+
+    def close(self):
+        """Close this thread's database connection."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.execute("PRAGMA optimize")
+            conn.close()
+            self._local.conn = None
+
+    def _configure_connection(self, conn: sqlite3.Connection):
+        """Apply connection-level tuning. WAL mode persists in the database file."""
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-64000")
+        conn.execute("PRAGMA mmap_size=268435456")
+
     def init_db(self):
         """Initialize database with schema."""
         conn = self.get_connection()
@@ -69,90 +244,245 @@ class Database:
                 source_image_path TEXT,
                 last_updated TEXT NOT NULL,
 
+                -- Duplicate-check keys (normalize_name of show_name / theater_name)
+                show_name_norm TEXT,
+                theater_name_norm TEXT,
+
                 UNIQUE(show_name, theater_name, date_attended)
             )
         """)
 
-        # Create processed_images table
+        # Create processed_images table, keyed directly on image_path
+        self._init_processed_images(cursor)
+
+        # Indexes for the search_shows filters and sorts
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_shows_status_rating ON shows(seen_status, rating)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_shows_date_added ON shows(date_added DESC)")
+        cursor.execute("DROP INDEX IF EXISTS idx_shows_theater")
+        cursor.execute("DROP INDEX IF EXISTS idx_shows_name")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_shows_theater_nocase ON shows(theater_name COLLATE NOCASE)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_shows_name_nocase ON shows(show_name COLLATE NOCASE)")
+        self._init_normalized_columns(cursor)
+
+        self.has_fts = self._init_fts(cursor)
+        self._init_show_categories(cursor)
+
+        # Give the planner statistics once; close() keeps them fresh with PRAGMA optimize
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'")
+        if cursor.fetchone() is None:
+            cursor.execute("ANALYZE")
+
+        conn.commit()
+
+    def _init_processed_images(self, cursor: sqlite3.Cursor):
+        """Create processed_images as a WITHOUT ROWID table, migrating the old rowid layout."""
+        cursor.execute("PRAGMA table_info(processed_images)")
+        columns = {row[1] for row in cursor.fetchall()}
+
+        if 'id' in columns:
+            cursor.execute("ALTER TABLE processed_images RENAME TO processed_images_old")
+
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS processed_images (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                image_path TEXT UNIQUE NOT NULL,
+                image_path TEXT PRIMARY KEY,
                 processed_date TEXT NOT NULL,
                 shows_extracted INTEGER DEFAULT 0
+            ) WITHOUT ROWID
+        """)
+
+        if 'id' in columns:
+            cursor.execute("""
+                INSERT OR REPLACE INTO processed_images (image_path, processed_date, shows_extracted)
+                SELECT image_path, processed_date, shows_extracted FROM processed_images_old ORDER BY id
+            """)
+            cursor.execute("DROP TABLE processed_images_old")
+
+    def _init_normalized_columns(self, cursor: sqlite3.Cursor):
+        """Add and backfill the duplicate-check columns on databases created before them."""
+        cursor.execute("PRAGMA table_info(shows)")
+        columns = {row[1] for row in cursor.fetchall()}
+        for column in NORMALIZED_COLUMNS:
+            if column not in columns:
+                cursor.execute(f"ALTER TABLE shows ADD COLUMN {column} TEXT")
+
+        rows = cursor.execute(
+            "SELECT id, show_name, theater_name FROM shows WHERE show_name_norm IS NULL"
+        ).fetchall()
+        if rows:
+            cursor.executemany(
+                "UPDATE shows SET show_name_norm = ?, theater_name_norm = ? WHERE id = ?",
+                [(normalize_name(row[1]), normalize_name(row[2]), row[0]) for row in rows]
             )
+
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_shows_normalized "
+            "ON shows(show_name_norm, theater_name_norm, date_attended)"
+        )
+
+    def _init_fts(self, cursor: sqlite3.Cursor) -> bool:
+        """Create the shows_fts index and its sync triggers. Returns False if FTS5 is unavailable."""
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'shows_fts'")
+        exists = cursor.fetchone() is not None
+
+        try:
+            cursor.execute(f"""
+                CREATE VIRTUAL TABLE IF NOT EXISTS shows_fts USING fts5(
+                    {_FTS_COLUMNS}, content='shows', content_rowid='id'
+                )
+            """)
+        except sqlite3.OperationalError:
+            return False
+
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS shows_ai AFTER INSERT ON shows BEGIN
+                INSERT INTO shows_fts (rowid, {_FTS_COLUMNS}) VALUES (new.id, {_FTS_NEW_VALUES});
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS shows_ad AFTER DELETE ON shows BEGIN
+                INSERT INTO shows_fts (shows_fts, rowid, {_FTS_COLUMNS}) VALUES ('delete', old.id, {_FTS_OLD_VALUES});
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS shows_au AFTER UPDATE OF {_FTS_COLUMNS} ON shows BEGIN
+                INSERT INTO shows_fts (shows_fts, rowid, {_FTS_COLUMNS}) VALUES ('delete', old.id, {_FTS_OLD_VALUES});
+                INSERT INTO shows_fts (rowid, {_FTS_COLUMNS}) VALUES (new.id, {_FTS_NEW_VALUES});
+            END
         """)
 
-        conn.commit()
-        conn.close()
+        # Index rows that predate the FTS table
+        if not exists:
+            cursor.execute("INSERT INTO shows_fts (shows_fts) VALUES ('rebuild')")
 
-    def add_show(self, show_data: Dict[str, Any]) -> int:
-        """Add a new show to the database."""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        return True
 
-        now = datetime.now().isoformat()
-        show_data['date_added'] = now
-        show_data['last_updated'] = now
+    def _init_show_categories(self, cursor: sqlite3.Cursor):
+        """Create the show_categories lookup table, kept in sync with the JSON category columns."""
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'show_categories'")
+        exists = cursor.fetchone() is not None
 
-        # Convert lists to JSON strings
-        json_fields = [
-            'lead_cast', 'tony_awards', 'other_awards', 'musical_numbers',
-            'themes', 'llm_categories', 'user_categories'
-        ]
-        for field in json_fields:
-            if field in show_data and isinstance(show_data[field], list):
-                show_data[field] = json.dumps(show_data[field])
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS show_categories (
+                show_id INTEGER NOT NULL,
+                source TEXT NOT NULL CHECK (source IN ('llm', 'user')),
+                category TEXT NOT NULL COLLATE NOCASE,
+                PRIMARY KEY (source, category, show_id)
+            ) WITHOUT ROWID
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_show_categories_show ON show_categories(show_id)")
 
-        columns = ', '.join(show_data.keys())
-        placeholders = ', '.join(['?' for _ in show_data])
+        fill_new = _SQL_FILL_SHOW_CATEGORIES.format(show='new', from_clause='')
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS show_categories_ai AFTER INSERT ON shows BEGIN
+                {fill_new}
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS show_categories_ad AFTER DELETE ON shows BEGIN
+                DELETE FROM show_categories WHERE show_id = old.id;
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS show_categories_au AFTER UPDATE OF llm_categories, user_categories ON shows BEGIN
+                DELETE FROM show_categories WHERE show_id = old.id;
+                {fill_new}
+            END
+        """)
 
-        cursor.execute(
-            f"INSERT INTO shows ({columns}) VALUES ({placeholders})",
-            list(show_data.values())
-        )
+        # Backfill shows that predate the table
+        if not exists:
+            for statement in _SQL_FILL_SHOW_CATEGORIES.format(show='shows', from_clause='shows,').split(';'):
+                if statement.strip():
+                    cursor.execute(statement)
 
-        show_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
+    def add_show(self, show_data: Dict[str, Any]) -> int:
+        """Add a new show to the database."""
+        return self.add_shows([show_data])[0]
+
+    def add_shows(self, shows: List[Dict[str, Any]],
+                  on_error: Optional[Callable[[int, sqlite3.IntegrityError], Any]] = None) -> List[Optional[int]]:
+        """
+        Add several shows in a single transaction. Returns the new IDs in order.
+        If on_error is given, a show that breaks a constraint is rolled back on its
+        own, reported as on_error(index, error) and gets None, and the rest are kept.
+        Otherwise the error is raised and nothing is added.
+        """
+        now = datetime.now().isoformat()
+        rows = []
+
+        for show_data in shows:
+            show_data['date_added'] = now
+            show_data['last_updated'] = now
+
+            # Convert lists to JSON strings
+            for field in JSON_FIELDS:
+                if field in show_data and isinstance(show_data[field], list):
+                    show_data[field] = _json_dumps(show_data[field])
+
+            row = [show_data.get(col, SHOW_COLUMN_DEFAULTS.get(col)) for col in SHOW_COLUMNS]
+            row.extend(normalize_name(show_data.get(source) or '') for source in NORMALIZED_COLUMNS.values())
+            rows.append(row)
+
+        # One commit for the whole batch; the fixed INSERT text is prepared once
+        # and reused for every row.
+        show_ids: List[Optional[int]] = []
+        with self.conn as conn:
+            if on_error is None:
+                for row in rows:
+                    show_ids.append(conn.execute(SQL_INSERT_SHOW, row).lastrowid)
+                return show_ids
+
+            # A savepoint per row, inside the open transaction, undoes just the bad row
+            if not conn.in_transaction:
+                conn.execute("BEGIN")
+            for i, row in enumerate(rows):
+                conn.execute("SAVEPOINT add_show")
+                try:
+                    show_ids.append(conn.execute(SQL_INSERT_SHOW, row).lastrowid)
+                except sqlite3.IntegrityError as e:
+                    conn.execute("ROLLBACK TO add_show")
+                    show_ids.append(None)
+                    on_error(i, e)
+                conn.execute("RELEASE add_show")
 
-        return show_id
+        return show_ids
 
     def update_show(self, show_id: int, updates: Dict[str, Any]):
         """Update an existing show."""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-
         updates['last_updated'] = datetime.now().isoformat()
 
         # Convert lists to JSON strings
-        json_fields = [
-            'lead_cast', 'tony_awards', 'other_awards', 'musical_numbers',
-            'themes', 'llm_categories', 'user_categories'
-        ]
-        for field in json_fields:
+        for field in JSON_FIELDS:
             if field in updates and isinstance(updates[field], list):
-                updates[field] = json.dumps(updates[field])
+                updates[field] = _json_dumps(updates[field])
 
-        set_clause = ', '.join([f"{k} = ?" for k in updates.keys()])
+        for column, source in NORMALIZED_COLUMNS.items():
+            if source in updates:
+                updates[column] = normalize_name(updates[source] or '')
 
-        cursor.execute(
-            f"UPDATE shows SET {set_clause} WHERE id = ?",
-            list(updates.values()) + [show_id]
-        )
+        set_clause = ', '.join([f"{k} = ?" for k in updates.keys()])
 
-        conn.commit()
-        conn.close()
+        with self.conn as conn:
+            conn.execute(
+                f"UPDATE shows SET {set_clause} WHERE id = ?",
+                list(updates.values()) + [show_id]
+            )
 
     def get_show(self, show_id: int) -> Optional[Dict[str, Any]]:
         """Get a show by ID."""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        row = self.conn.execute(SQL_GET_SHOW, (show_id,)).fetchone()
 
-        cursor.execute("SELECT * FROM shows WHERE id = ?", (show_id,))
-        row = cursor.fetchone()
+        if row:
+            return self._row_to_dict(row)
+        return None
 
-        conn.close()
+    def find_by_normalized(self, show_name_norm: str, theater_name_norm: str,
+                           date_attended: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Get the newest show with these normalized names, and this date_attended if given."""
+        row = self.conn.execute(
+            SQL_FIND_BY_NORMALIZED,
+            (show_name_norm, theater_name_norm, date_attended, date_attended)
+        ).fetchone()
 
         if row:
             return self._row_to_dict(row)
@@ -160,121 +490,151 @@ class Database:
 
     def get_show_by_name(self, show_name: str, theater_name: str = None) -> Optional[Dict[str, Any]]:
         """Get a show by name and optionally theater."""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-
         if theater_name:
-            cursor.execute(
-                "SELECT * FROM shows WHERE show_name = ? AND theater_name = ?",
-                (show_name, theater_name)
-            )
+            cursor = self.conn.execute(SQL_GET_SHOW_BY_NAME_AND_THEATER, (show_name, theater_name))
         else:
-            cursor.execute("SELECT * FROM shows WHERE show_name = ?", (show_name,))
+            cursor = self.conn.execute(SQL_GET_SHOW_BY_NAME, (show_name,))
 
         row = cursor.fetchone()
 
-        conn.close()
-
         if row:
             return self._row_to_dict(row)
         return None
 
-    def search_shows(self, filters: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Search shows with various filters."""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+    def search_shows(self, filters: Dict[str, Any], parse_json: bool = True,
+                     columns: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Search shows with various filters. See iter_shows for the arguments."""
+        return list(self.iter_shows(filters, parse_json=parse_json, columns=columns))
+
+    def iter_shows(self, filters: Dict[str, Any], parse_json: bool = True,
+                   columns: Optional[List[str]] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Search shows with various filters, yielding rows as they are read.
+        The query runs (and invalid filters raise) immediately; rows are then
+        streamed from the cursor in batches rather than fetched all at once.
+        With parse_json=False the list fields are left as their stored JSON text,
+        for callers that only read scalar columns. Pass columns to fetch only
+        those columns instead of the whole row.
+        """
+        if columns:
+            for column in columns:
+                if not _IDENTIFIER_RE.match(column):
+                    raise ValueError(f"Invalid column name: {column}")
+            select_list = ', '.join(columns)
+        else:
+            select_list = SHOW_SELECT_LIST
 
-        query = "SELECT * FROM shows WHERE 1=1"
+        # WHERE clauses and their parameters are collected in order and joined once
+        parts = [f"SELECT {select_list} FROM shows WHERE 1=1"]
         params = []
 
-        if 'show_name' in filters:
-            query += " AND show_name LIKE ?"
-            params.append(f"%{filters['show_name']}%")
-
-        if 'theater_name' in filters:
-            query += " AND theater_name LIKE ?"
-            params.append(f"%{filters['theater_name']}%")
+        # Text filters become one MATCH against the full-text index (prefix
+        # match per word); LIKE is only used when FTS5 can't serve the value.
+        match_terms = []
+        for key, column in FTS_FILTERS.items():
+            if key not in filters:
+                continue
+            term = _fts_match_term(column, filters[key]) if self.has_fts else None
+            if term:
+                match_terms.append(term)
+            else:
+                parts.append(f" AND {column} LIKE ?")
+                params.append(f"%{filters[key]}%")
+
+        for key, source in CATEGORY_FILTERS.items():
+            if key in filters:
+                parts.append(
+                    " AND EXISTS (SELECT 1 FROM show_categories"
+                    " WHERE show_id = shows.id AND source = ? AND category = ?)"
+                )
+                params.extend([source, str(filters[key]).strip()])
+
+        if match_terms:
+            parts.insert(0, _FTS_CTE)
+            parts.append(" AND id IN (SELECT rowid FROM fts_matches)")
+            params.insert(0, ' AND '.join(match_terms))
 
         if 'seen_status' in filters:
-            query += " AND seen_status = ?"
+            parts.append(" AND seen_status = ?")
             params.append(filters['seen_status'])
 
         if 'rating_min' in filters:
-            query += " AND rating >= ?"
+            parts.append(" AND rating >= ?")
             params.append(filters['rating_min'])
 
         if 'rating_max' in filters:
-            query += " AND rating <= ?"
+            parts.append(" AND rating <= ?")
             params.append(filters['rating_max'])
 
-        if 'genre' in filters:
-            query += " AND genre LIKE ?"
-            params.append(f"%{filters['genre']}%")
-
-        if 'category' in filters:
-            query += " AND llm_categories LIKE ?"
-            params.append(f"%{filters['category']}%")
-
-        if 'user_category' in filters:
-            query += " AND user_categories LIKE ?"
-            params.append(f"%{filters['user_category']}%")
-
         if 'sort_by' in filters:
-            sort_field = filters['sort_by']
-            sort_order = filters.get('sort_order', 'ASC')
-            query += f" ORDER BY {sort_field} {sort_order}"
+            sort_key = (filters['sort_by'], str(filters.get('sort_order', 'ASC')).upper())
         else:
-            query += " ORDER BY date_added DESC"
-
-        cursor.execute(query, params)
-        rows = cursor.fetchall()
+            sort_key = ('date_added', 'DESC')
 
-        conn.close()
+        if sort_key not in _ORDER_BY:
+            raise ValueError(f"Invalid sort: {sort_key[0]} {sort_key[1]}")
+        parts.append(_ORDER_BY[sort_key])
 
-        return [self._row_to_dict(row) for row in rows]
+        if 'limit' in filters:
+            parts.append(" LIMIT ?")
+            params.append(filters['limit'])
 
-    def get_all_shows(self) -> List[Dict[str, Any]]:
+        query = ''.join(parts)
+        cursor = self.conn.cursor()
+        cursor.row_factory = None  # plain tuples, zipped with the column names below
+        cursor.arraysize = 256
+        cursor.execute(query, params)
+        return self._stream_rows(cursor, parse_json)
+
+    def _stream_rows(self, cursor: sqlite3.Cursor, parse_json: bool) -> Iterator[Dict[str, Any]]:
+        """Yield rows as dicts one fetchmany() batch at a time."""
+        keys = [column[0] for column in cursor.description]
+        while True:
+            rows = cursor.fetchmany()
+            if not rows:
+                break
+            for row in rows:
+                show = dict(zip(keys, row))
+                yield self._parse_json_fields(show) if parse_json else show
+
+    def get_all_shows(self, parse_json: bool = True, columns: Optional[List[str]] = None) -> List[Dict[str, Any]]:
         """Get all shows."""
-        return self.search_shows({})
+        return self.search_shows({}, parse_json=parse_json, columns=columns)
 
     def mark_image_processed(self, image_path: str, shows_extracted: int):
         """Mark an image as processed."""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-
-        cursor.execute(
-            "INSERT OR REPLACE INTO processed_images (image_path, processed_date, shows_extracted) VALUES (?, ?, ?)",
-            (image_path, datetime.now().isoformat(), shows_extracted)
-        )
-
-        conn.commit()
-        conn.close()
+        with self.conn as conn:
+            conn.execute(
+                SQL_MARK_IMAGE_PROCESSED,
+                (image_path, datetime.now().isoformat(), shows_extracted)
+            )
 
     def is_image_processed(self, image_path: str) -> bool:
         """Check if an image has been processed."""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        result = self.conn.execute(SQL_IS_IMAGE_PROCESSED, (image_path,)).fetchone()
 
-        cursor.execute("SELECT id FROM processed_images WHERE image_path = ?", (image_path,))
-        result = cursor.fetchone()
+        return result is not None
 
-        conn.close()
+    def get_processed_paths(self, prefix: str = '') -> Set[str]:
+        """Get the paths of all processed images that start with prefix."""
+        if not prefix:
+            rows = self.conn.execute("SELECT image_path FROM processed_images")
+        else:
+            upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+            rows = self.conn.execute(SQL_GET_PROCESSED_PATHS, (prefix, upper))
 
-        return result is not None
+        return {row[0] for row in rows}
 
     def _row_to_dict(self, row: sqlite3.Row) -> Dict[str, Any]:
         """Convert a database row to a dictionary with JSON fields parsed."""
-        show = dict(row)
-
-        # Parse JSON fields
-        json_fields = [
-            'lead_cast', 'tony_awards', 'other_awards', 'musical_numbers',
-            'themes', 'llm_categories', 'user_categories'
-        ]
-        for field in json_fields:
+        return self._parse_json_fields(dict(row))
+
+    def _parse_json_fields(self, show: Dict[str, Any]) -> Dict[str, Any]:
+        """Parse the JSON list fields of a show dict in place and return it."""
+        for field in JSON_FIELDS:
             if show.get(field):
                 try:
-                    show[field] = json.loads(show[field])
+                    show[field] = _json_loads(show[field])
                 except json.JSONDecodeError:
                     show[field] = []
 
@@ -1,110 +1,202 @@
 #!/usr/bin/env python3
 """
 Generate a single-page application for the Broadway shows database.
-Outputs: index.html + data.json
+Outputs: index.html + data.json, each with a gzip-precompressed .gz copy
 """
 
 import os
+import sys
+import gzip
 import json
+import filecmp
+import hashlib
 import sqlite3
-from datetime import datetime
-from collections import defaultdict
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from collections import defaultdict, namedtuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 DB_PATH = "shows.db"
 OUTPUT_DIR = "site"
+STATE_FILE = ".site_state.json"
 
+# Top-level pages written by the old multi-page generator, plus the temp file
+# an interrupted run can leave behind. Only these names are ever removed.
+LEGACY_FILES = (
+    'timeline.html', 'shows.html', 'theaters.html', 'genres.html', 'categories.html',
+    'data.json.tmp',
+)
+# Page directories written by the old multi-page generator; their .html pages are pruned
+LEGACY_DIRS = ('shows', 'theaters', 'genres', 'categories')
 
-def parse_json_field(value):
-    if not value:
-        return []
-    try:
-        result = json.loads(value)
-        return result if isinstance(result, list) else [result]
-    except:
-        return [value] if value else []
+# Bump when the data.json record layout changes; the page template is versioned by its hash
+DATA_VERSION = "v2"
+
+# Columns read by generate_data_json. Columns missing from the table are selected as NULL.
+SPA_COLUMNS = (
+    'id', 'show_name', 'theater_name', 'seen_status', 'date_attended', 'rating',
+    'date_added', 'show_type', 'music_by', 'lyrics_by', 'book_by',
+    'original_premiere_year', 'synopsis', 'personal_notes',
+    'notable_cast', 'awards', 'famous_songs', 'year_attended',
+)
+
+# Columns trimmed in SQL rather than sliced per row in Python: name -> (source column, expression)
+SPA_DERIVED = {
+    'date_added': ('date_added', 'substr(date_added, 1, 10) AS date_added'),
+    'year_attended': ('date_attended', "CASE WHEN date_attended GLOB '[0-9][0-9][0-9][0-9]*' "
+                                       "THEN substr(date_attended, 1, 4) END AS year_attended"),
+}
+
+# List fields are normalized to JSON array text by SQLite and spliced into the
+# output as-is, so they are never decoded and re-encoded in Python. Empty
+# values become [], a non-array JSON value is wrapped, and text that isn't
+# JSON becomes a one-item array.
+SPA_LIST_COLUMNS = ('notable_cast', 'awards', 'famous_songs')
+_JSON_LIST_SQL = (
+    "CASE WHEN {0} IS NULL OR {0} = '' THEN '[]' "
+    "WHEN json_valid({0}) THEN CASE json_type({0}) WHEN 'array' THEN json({0}) ELSE json_array(json({0})) END "
+    "ELSE json_array({0}) END AS {0}"
+)
+for _col in SPA_LIST_COLUMNS:
+    SPA_DERIVED[_col] = (_col, _JSON_LIST_SQL.format(_col))
+
+# Closes each record after the scalar fields: cast, awards, songs
+_LIST_FIELDS_TAIL = b',"cast":%b,"awards":%b,"songs":%b}'
+
+# Collection-wide stats in one aggregate scan, so the per-row loop only builds records
+SQL_STATS = """
+    SELECT
+        SUM(seen_status = 'seen'),
+        SUM(seen_status = 'wishlist'),
+        AVG(CASE WHEN seen_status = 'seen' AND rating THEN rating END),
+        MAX(substr(last_updated, 1, 10))
+    FROM shows
+"""
+
+# Lightweight row type for generation; avoids building a dict per show.
+ShowRow = namedtuple('ShowRow', SPA_COLUMNS)
 
 
-def get_all_shows(db_path):
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
+def get_all_shows(conn):
+    """Yield ShowRow tuples one row at a time straight from the cursor."""
     cursor = conn.cursor()
-    cursor.execute("SELECT * FROM shows ORDER BY show_name")
-    shows = [dict(row) for row in cursor.fetchall()]
-    conn.close()
+    cursor.row_factory = None  # plain tuples feed ShowRow._make directly
+    available = {row[1] for row in cursor.execute("PRAGMA table_info(shows)")}
+    select = []
+    for col in SPA_COLUMNS:
+        source, expr = SPA_DERIVED.get(col, (col, col))
+        if source in available:
+            select.append(expr)
+        else:
+            select.append(f"'[]' AS {col}" if col in SPA_LIST_COLUMNS else f"NULL AS {col}")
+    columns = ', '.join(select)
+    cursor.execute(f"SELECT {columns} FROM shows ORDER BY show_name COLLATE NOCASE")
     
-    for show in shows:
-        show['cast_list'] = parse_json_field(show.get('notable_cast'))
-        show['awards_list'] = parse_json_field(show.get('awards'))
-        show['songs_list'] = parse_json_field(show.get('famous_songs'))
-    
-    return shows
-
-
-def generate_data_json(shows):
-    data = {
-        'shows': [],
-        'stats': {
-            'total': len(shows),
-            'seen': sum(1 for s in shows if s.get('seen_status') == 'seen'),
-            'wishlist': sum(1 for s in shows if s.get('seen_status') == 'wishlist'),
-        },
-        'theaters': defaultdict(list),
-        'types': defaultdict(list),
-        'years': defaultdict(list),
+    make_row = ShowRow._make
+    for row in cursor:
+        yield make_row(row)
+
+
+def get_stats(conn):
+    """Seen/wishlist counts, average seen rating and latest edit date, computed by SQLite."""
+    seen, wishlist, avg_rating, updated = conn.execute(SQL_STATS).fetchone()
+    return {
+        'seen': seen or 0,
+        'wishlist': wishlist or 0,
+        'avg_rating': round(avg_rating, 1) if avg_rating is not None else 0,
+        # Latest edit date in the data, so the footer date doesn't change on no-op rebuilds
+        'updated': updated or '',
     }
+
+
+def generate_data_json(shows, f, summary, hashes=None):
+    """
+    Stream data.json to the binary file f, encoding each show as it arrives.
+    Only the small id groupings are held in memory. summary holds the
+    get_stats() values; the total and theater count are added here.
+    Returns the stats. If hashes is a dict, it is filled with
+    {show id: SHA-256 of its record}.
+    """
+    theaters = defaultdict(list)
+    types = defaultdict(list)
+    years = defaultdict(list)
     
-    ratings = [s['rating'] for s in shows if s.get('rating') and s.get('seen_status') == 'seen']
-    data['stats']['avg_rating'] = round(sum(ratings) / len(ratings), 1) if ratings else 0
+    # Hoisted for the hot loop
+    write = f.write
+    total = 0
     
+    # Single pass: build the show records and the groupings together
     for show in shows:
-        show_data = {
-            'id': show['id'],
-            'name': show['show_name'],
-            'theater': show.get('theater_name') or '',
-            'status': show.get('seen_status') or 'wishlist',
-            'date_attended': show.get('date_attended') or '',
-            'rating': show.get('rating'),
-            'date_added': show['date_added'][:10] if show.get('date_added') else '',
-            'type': show.get('show_type') or '',
-            'music_by': show.get('music_by') or '',
-            'lyrics_by': show.get('lyrics_by') or '',
-            'book_by': show.get('book_by') or '',
-            'premiere_year': show.get('original_premiere_year'),
-            'synopsis': show.get('synopsis') or '',
-            'cast': show['cast_list'],
-            'awards': show['awards_list'],
-            'songs': show['songs_list'],
-            'notes': show.get('personal_notes') or '',
-        }
-        data['shows'].append(show_data)
+        show_id = show.id
+        status = show.seen_status
+        rating = show.rating
+        theater_name = show.theater_name
+        show_type = show.show_type
+        date_attended = show.date_attended
+        
+        write(b',' if total else b'{"shows":[')
+        total += 1
+        record = dump_json({
+            'id': show_id,
+            'name': show.show_name,
+            'theater': theater_name or '',
+            'status': status or 'wishlist',
+            'date_attended': date_attended or '',
+            'rating': rating,
+            'date_added': show.date_added or '',
+            'type': show_type or '',
+            'music_by': show.music_by or '',
+            'lyrics_by': show.lyrics_by or '',
+            'book_by': show.book_by or '',
+            'premiere_year': show.original_premiere_year,
+            'synopsis': show.synopsis or '',
+            'notes': show.personal_notes or '',
+        })
+        record = record[:-1] + _LIST_FIELDS_TAIL % (
+            show.notable_cast.encode('utf-8'),
+            show.awards.encode('utf-8'),
+            show.famous_songs.encode('utf-8'),
+        )
+        write(record)
+        if hashes is not None:
+            hashes[str(show_id)] = hashlib.sha256(record).hexdigest()
         
-        if show.get('theater_name'):
-            if show['id'] not in data['theaters'][show['theater_name']]:
-                data['theaters'][show['theater_name']].append(show['id'])
+        # Each show is visited once, so its id can't already be in a group
+        if theater_name:
+            theaters[theater_name].append(show_id)
         
-        if show.get('show_type'):
-            if show['id'] not in data['types'][show['show_type']]:
-                data['types'][show['show_type']].append(show['id'])
+        if show_type:
+            types[show_type].append(show_id)
         
-        if show.get('date_attended'):
-            try:
-                year = show['date_attended'][:4]
-                if show['id'] not in data['years'][year]:
-                    data['years'][year].append(show['id'])
-            except:
-                pass
+        year = show.year_attended
+        if year:
+            years[year].append(show_id)
     
-    data['stats']['theater_count'] = len(data['theaters'])
+    stats = {'total': total, **summary, 'theater_count': len(theaters)}
     
-    data['theaters'] = dict(data['theaters'])
-    data['types'] = dict(data['types'])
-    data['years'] = dict(data['years'])
+    write(b']' if total else b'{"shows":[]')
+    write(b',"stats":' + dump_json(stats))
+    write(b',"theaters":' + dump_json(theaters))
+    write(b',"types":' + dump_json(types))
+    write(b',"years":' + dump_json(years))
+    write(b'}')
     
-    return data
+    return stats
 
 
-def generate_html():
-    return '''<!DOCTYPE html>
+def dump_json(data):
+    """Serialize to UTF-8 JSON bytes, using orjson when it is installed."""
+    if orjson:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data).encode('utf-8')
+
+
+# The page is static; all data comes from data.json at load time
+_HTML = '''<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
@@ -305,22 +397,54 @@ def generate_html():
         </div>
     </div>
     
-    <footer>Generated <span id="timestamp"></span></footer>
+    <footer>Updated <span id="timestamp"></span></footer>
     
     <script>
     let DATA = null;
+    const SHOWS_BY_ID = new Map();
     let currentView = 'all';
     let currentFilter = null;
     
     async function init() {
         const resp = await fetch('data.json');
         DATA = await resp.json();
-        document.getElementById('timestamp').textContent = new Date().toLocaleDateString();
+        prepareShows(DATA.shows);
+        document.getElementById('timestamp').textContent = DATA.stats.updated;
         renderStats();
         renderShows(DATA.shows);
         setupEventListeners();
     }
     
+    // Derive per-show display strings and the id index in one pass at load
+    function prepareShows(shows) {
+        for (const s of shows) {
+            SHOWS_BY_ID.set(s.id, s);
+            s._name = esc(s.name);
+            s._theater = esc(s.theater) || 'Unknown theater';
+            s._type = esc(s.type);
+            s._statusText = s.status === 'seen' ? 'Seen' : 'Wishlist';
+            s._stars = s.rating ? '★'.repeat(s.rating) + '☆'.repeat(10 - s.rating) : '';
+            s._search = [s.name, s.theater, s.synopsis, ...s.songs].join('\\n').toLowerCase();
+            s._card = cardHtml(s);
+        }
+    }
+    
+    // A show's card is the same in every list, so it is built once and reused
+    function cardHtml(s) {
+        return `
+            <div class="show-card" onclick="showShow(${s.id})">
+                <h3>${s._name}</h3>
+                <div class="theater">${s._theater}</div>
+                <div class="meta">
+                    <span class="status ${s.status}">${s._statusText}</span>
+                    ${s.date_attended ? ` • ${s.date_attended}` : ''}
+                    ${s.rating ? ` • <span class="rating">${s._stars}</span>` : ''}
+                </div>
+                ${s.type ? `<span class="type-badge">${s._type}</span>` : ''}
+            </div>
+        `;
+    }
+    
     function renderStats() {
         const s = DATA.stats;
         document.getElementById('stats').innerHTML = `
@@ -334,25 +458,15 @@ def generate_html():
     
     function renderShows(shows) {
         document.getElementById('results-count').textContent = `${shows.length} show${shows.length !== 1 ? 's' : ''}`;
-        document.getElementById('shows').innerHTML = shows.map(s => `
-            <div class="show-card" onclick="showShow(${s.id})">
-                <h3>${esc(s.name)}</h3>
-                <div class="theater">${esc(s.theater) || 'Unknown theater'}</div>
-                <div class="meta">
-                    <span class="status ${s.status}">${s.status === 'seen' ? 'Seen' : 'Wishlist'}</span>
-                    ${s.date_attended ? ` • ${s.date_attended}` : ''}
-                    ${s.rating ? ` • <span class="rating">${'★'.repeat(s.rating)}${'☆'.repeat(10-s.rating)}</span>` : ''}
-                </div>
-                ${s.type ? `<span class="type-badge">${esc(s.type)}</span>` : ''}
-            </div>
-        `).join('');
+        document.getElementById('shows').innerHTML = shows.map(s => s._card).join('');
     }
     
     function renderFilters(type) {
         let items = [];
         if (type === 'theaters') items = Object.entries(DATA.theaters).map(([k,v]) => [k, v.length]).sort((a,b) => b[1]-a[1]);
         else if (type === 'types') items = Object.entries(DATA.types).map(([k,v]) => [k, v.length]).sort((a,b) => b[1]-a[1]);
-        else if (type === 'years') items = Object.entries(DATA.years).map(([k,v]) => [k, v.length]).sort((a,b) => b[0].localeCompare(a[0]));
+        // Year keys are four ASCII digits, so a plain comparison orders them without localeCompare
+        else if (type === 'years') items = Object.entries(DATA.years).map(([k,v]) => [k, v.length]).sort((a,b) => a[0] < b[0] ? 1 : a[0] > b[0] ? -1 : 0);
         
         if (items.length === 0) {
             document.getElementById('filters').style.display = 'none';
@@ -363,7 +477,10 @@ def generate_html():
         document.getElementById('filters').innerHTML = `
             <div class="filter-title">${type.charAt(0).toUpperCase() + type.slice(1)} (${items.length})</div>
             <div class="filter-tags">
-                ${items.map(([name, count]) => `<span class="filter-tag" data-filter="${esc(name)}">${esc(name)}<span class="count">(${count})</span></span>`).join('')}
+                ${items.map(([name, count]) => {
+                    const e = esc(name);
+                    return `<span class="filter-tag" data-filter="${e}">${e}<span class="count">(${count})</span></span>`;
+                }).join('')}
             </div>
         `;
     }
@@ -374,33 +491,28 @@ def generate_html():
         else if (type === 'types') ids = DATA.types[value] || [];
         else if (type === 'years') ids = DATA.years[value] || [];
         
-        const shows = DATA.shows.filter(s => ids.includes(s.id));
-        renderShows(shows);
+        // Group ids are already in show order, so look them up instead of scanning every show
+        renderShows(ids.map(id => SHOWS_BY_ID.get(id)));
     }
     
     function searchShows(query) {
         const q = query.toLowerCase();
-        const shows = DATA.shows.filter(s => 
-            s.name.toLowerCase().includes(q) ||
-            (s.theater && s.theater.toLowerCase().includes(q)) ||
-            s.songs.some(x => x.toLowerCase().includes(q)) ||
-            (s.synopsis && s.synopsis.toLowerCase().includes(q))
-        );
+        const shows = DATA.shows.filter(s => s._search.includes(q));
         renderShows(shows);
     }
     
     function showShow(id) {
-        const s = DATA.shows.find(x => x.id === id);
+        const s = SHOWS_BY_ID.get(id);
         if (!s) return;
         
         document.getElementById('modal-content').innerHTML = `
-            <h2>${esc(s.name)}</h2>
-            <div class="theater">${esc(s.theater) || 'Unknown theater'}</div>
+            <h2>${s._name}</h2>
+            <div class="theater">${s._theater}</div>
             <div class="meta-row">
-                <span class="status ${s.status}">${s.status === 'seen' ? 'Seen' : 'Wishlist'}</span>
-                ${s.type ? ` • <span class="type-badge">${esc(s.type)}</span>` : ''}
+                <span class="status ${s.status}">${s._statusText}</span>
+                ${s.type ? ` • <span class="type-badge">${s._type}</span>` : ''}
                 ${s.date_attended ? ` • Attended: ${s.date_attended}` : ''}
-                ${s.rating ? ` • <span class="rating">${'★'.repeat(s.rating)}${'☆'.repeat(10-s.rating)} ${s.rating}/10</span>` : ''}
+                ${s.rating ? ` • <span class="rating">${s._stars} ${s.rating}/10</span>` : ''}
             </div>
             ${s.premiere_year ? `<div class="meta-row"><span class="label">Premiere:</span> ${s.premiere_year}</div>` : ''}
             ${s.music_by ? `<div class="meta-row"><span class="label">Music:</span> ${esc(s.music_by)}</div>` : ''}
@@ -472,25 +584,208 @@ def generate_html():
 </html>'''
 
 
-def generate_site():
+# Encoded once at import; both the page write and the template version use it
+_HTML_BYTES = _HTML.encode('utf-8')
+
+TEMPLATE_VERSION = f"{DATA_VERSION}-{hashlib.sha256(_HTML_BYTES).hexdigest()[:12]}"
+
+
+def generate_html():
+    return _HTML
+
+
+def load_state():
+    """Load the state saved by the previous run, or {} if there is none."""
+    try:
+        with open(STATE_FILE, 'rb') as f:
+            data = f.read()
+        return orjson.loads(data) if orjson else json.loads(data)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def save_state(state):
+    write_bytes(STATE_FILE, dump_json(state))
+
+
+def db_fingerprint(db_path):
+    """Cheap change key: [mtime_ns, size] of the database file and of its WAL file, if any."""
+    key = []
+    for path in (db_path, db_path + '-wal'):
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            key.append(None)
+        else:
+            key.append([st.st_mtime_ns, st.st_size])
+    return key
+
+
+def db_hash(db_path):
+    """SHA-256 over the database file and its WAL file, read in 64 KB chunks."""
+    h = hashlib.sha256()
+    for path in (db_path, db_path + '-wal'):
+        try:
+            f = open(path, 'rb')
+        except FileNotFoundError:
+            continue
+        with f:
+            for chunk in iter(lambda: f.read(1 << 16), b''):
+                h.update(chunk)
+    return h.hexdigest()
+
+
+def write_bytes(path, data):
+    """Write pre-encoded bytes straight to the file descriptor, with no buffered file object."""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+
+def write_if_changed(path, data):
+    """Write data to path unless the file already holds exactly these bytes. Returns True if written."""
+    try:
+        if os.path.getsize(path) == len(data):
+            with open(path, 'rb') as f:
+                if f.read() == data:
+                    return False
+    except FileNotFoundError:
+        pass
+    write_bytes(path, data)
+    return True
+
+
+def write_gzip_copy(path):
+    """Write a precompressed path + '.gz' next to path for hosts that serve it directly."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    # mtime=0 keeps the archive bytes stable, so an unchanged copy is not rewritten
+    return write_if_changed(path + '.gz', gzip.compress(data, compresslevel=9, mtime=0))
+
+
+def prune_stale_outputs():
+    """
+    Delete the outputs of the old multi-page generator from OUTPUT_DIR: the
+    LEGACY_FILES and the pages in LEGACY_DIRS. Anything else, including files
+    added by hand, is left alone. Returns the count.
+    """
+    removed = 0
+    with os.scandir(OUTPUT_DIR) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False) and entry.name in LEGACY_DIRS:
+                with os.scandir(entry.path) as pages:
+                    for page in pages:
+                        if page.is_file(follow_symlinks=False) and page.name.endswith('.html'):
+                            os.unlink(page.path)
+                            removed += 1
+                try:
+                    os.rmdir(entry.path)
+                except OSError:
+                    pass  # holds files we didn't generate
+            elif entry.is_file(follow_symlinks=False) and entry.name in LEGACY_FILES:
+                os.unlink(entry.path)
+                removed += 1
+    return removed
+
+
+def generate_site(force=False):
     print("Generating broadway SPA...")
     
+    # The read-only connection below can't create the database, unlike the tracker
+    if not os.path.exists(DB_PATH):
+        sys.exit(f"No database at '{DB_PATH}' yet; add shows with show_tracker.py first")
+    
     os.makedirs(OUTPUT_DIR, exist_ok=True)
     
-    shows = get_all_shows(DB_PATH)
-    print(f"Found {len(shows)} shows")
+    data_path = os.path.join(OUTPUT_DIR, 'data.json')
+    html_path = os.path.join(OUTPUT_DIR, 'index.html')
+    tmp_path = data_path + '.tmp'
+    
+    # Per-show record hashes from the last run; a template change invalidates them all
+    state = {} if force else load_state()
+    same_template = state.get('template_version') == TEMPLATE_VERSION
+    prev_hashes = state.get('shows', {}) if same_template else {}
+    prev_stats = state.get('stats') if same_template else None
+    hashes = {}
+    
+    # Skip the whole run when the database files are untouched (stat only) or,
+    # failing that, byte-identical to the last run (one streaming hash)
+    outputs = (data_path, html_path, data_path + '.gz', html_path + '.gz')
+    if same_template and all(os.path.exists(path) for path in outputs):
+        fingerprint = db_fingerprint(DB_PATH)
+        unchanged = fingerprint == state.get('db_key')
+        if not unchanged and db_hash(DB_PATH) == state.get('db_hash'):
+            # Touched but not modified; remember the new stat key
+            save_state(dict(state, db_key=fingerprint))
+            unchanged = True
+        if unchanged:
+            print("Database unchanged, nothing to do")
+            return
+    
+    # Read-only: a build never migrates, analyzes or optimizes the tracker's database
+    conn = sqlite3.connect(f"file:{DB_PATH}?mode=ro", uri=True)
+    try:
+        conn.execute("PRAGMA mmap_size=268435456")
+        with open(tmp_path, 'wb') as f:
+            stats = generate_data_json(get_all_shows(conn), f, get_stats(conn), hashes)
+    finally:
+        conn.close()
+    print(f"Found {stats['total']} shows")
+    
+    # Files whose .gz copies are refreshed at the end of the run
+    compress = []
+    # The records and their groupings are covered by the per-show hashes; the
+    # stats tail (e.g. the latest last_updated date) is compared separately
+    if hashes == prev_hashes and stats == prev_stats and os.path.exists(data_path):
+        os.remove(tmp_path)
+        print("Show records and stats unchanged, kept data.json")
+    elif os.path.exists(data_path) and filecmp.cmp(tmp_path, data_path, shallow=False):
+        # No usable saved state (or --force), but the existing file is already current
+        os.remove(tmp_path)
+        print("data.json already up to date")
+    else:
+        changed = sum(1 for show_id, h in hashes.items() if prev_hashes.get(show_id) != h)
+        removed = len(prev_hashes.keys() - hashes.keys())
+        os.replace(tmp_path, data_path)
+        compress.append(data_path)
+        print(f"Generated data.json ({changed} changed, {removed} removed)")
+    
+    if not same_template or not os.path.exists(html_path):
+        if write_if_changed(html_path, _HTML_BYTES):
+            compress.append(html_path)
+            print("Generated index.html")
+    
+    written = len(compress)
+    for path in (data_path, html_path):
+        if path not in compress and not os.path.exists(path + '.gz'):
+            compress.append(path)
+    
+    # zlib releases the GIL, so the copies compress in parallel
+    if compress:
+        with ThreadPoolExecutor(max_workers=len(compress)) as pool:
+            written += sum(pool.map(write_gzip_copy, compress))
     
-    data = generate_data_json(shows)
-    with open(os.path.join(OUTPUT_DIR, 'data.json'), 'w') as f:
-        json.dump(data, f)
-    print("Generated data.json")
+    removed = prune_stale_outputs()
+    if removed:
+        print(f"Removed {removed} stale file(s)")
     
-    with open(os.path.join(OUTPUT_DIR, 'index.html'), 'w') as f:
-        f.write(generate_html())
-    print("Generated index.html")
+    # Fingerprint after the read, so the stored key describes the files exactly as read
+    save_state({
+        'template_version': TEMPLATE_VERSION,
+        'db_key': db_fingerprint(DB_PATH),
+        'db_hash': db_hash(DB_PATH),
+        'shows': hashes,
+        'stats': stats,
+    })
     
-    print(f"\n✓ Site generated in '{OUTPUT_DIR}/' (2 files)")
+    print(f"\n✓ Site generated in '{OUTPUT_DIR}/' ({written} files written)")
 
 
 if __name__ == "__main__":
-    generate_site()
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--force', action='store_true', help='Regenerate even if nothing changed')
+    generate_site(force=parser.parse_args().force)
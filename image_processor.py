@@ -9,6 +9,14 @@ class ImageProcessor:
         self.config = config
         self.db = db
         self.image_extensions = config['settings']['image_extensions']
+        # Lowercased tuple so one str.endswith call checks every extension
+        self._extension_suffixes = tuple(ext.lower() for ext in self.image_extensions)
+
+        # (directory prefix, status) pairs, checked in order by get_seen_status_from_directory
+        self._status_prefixes = [
+            (os.path.join(os.path.abspath(config['directories']['shows_seen']), ''), 'seen'),
+            (os.path.join(os.path.abspath(config['directories']['shows_wishlist']), ''), 'wishlist'),
+        ]
 
     def scan_directory(self, directory: str) -> List[str]:
         """Scan a directory for unprocessed images."""
@@ -20,24 +28,27 @@ class ImageProcessor:
             return []
 
         unprocessed_images = []
-
-        for file_path in dir_path.iterdir():
-            if file_path.is_file() and file_path.suffix.lower() in self.image_extensions:
-                image_path_str = str(file_path.absolute())
-                if not self.db.is_image_processed(image_path_str):
-                    unprocessed_images.append(image_path_str)
+        base_path = str(dir_path.absolute())
+        # One query for everything already processed here instead of one per file
+        processed = self.db.get_processed_paths(os.path.join(base_path, ''))
+
+        # scandir entries carry the file type, so filtering needs no stat() per file
+        with os.scandir(base_path) as entries:
+            for entry in entries:
+                if entry.is_file() and entry.name.lower().endswith(self._extension_suffixes):
+                    image_path_str = os.path.join(base_path, entry.name)
+                    if image_path_str not in processed:
+                        unprocessed_images.append(image_path_str)
 
         return unprocessed_images
 
     def get_seen_status_from_directory(self, image_path: str) -> str:
         """Determine seen status based on which directory the image is in."""
-        shows_seen = self.config['directories']['shows_seen']
-        shows_wishlist = self.config['directories']['shows_wishlist']
-
-        if shows_seen in image_path:
-            return 'seen'
-        elif shows_wishlist in image_path:
-            return 'wishlist'
-        else:
-            # Default to wishlist if cannot determine
-            return 'wishlist'
+        image_path = os.path.abspath(image_path)
+
+        for prefix, status in self._status_prefixes:
+            if image_path.startswith(prefix):
+                return status
+
+        # Default to wishlist if cannot determine
+        return 'wishlist'
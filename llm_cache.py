@@ -0,0 +1,48 @@
+import hashlib
+import time
+from typing import Optional
+from database import Database
+
+# Part of every cache key. Bump it whenever a prompt or the way responses are
+# parsed changes, so entries written for the old prompts stop matching.
+PROMPT_VERSION = 3
+
+SQL_GET_RESPONSE = "SELECT response FROM llm_cache WHERE key = ?"
+SQL_SET_RESPONSE = (
+    "INSERT OR REPLACE INTO llm_cache (key, model, response, created_at) "
+    "VALUES (?, ?, ?, ?)"
+)
+
+
+class LLMCache:
+    """
+    Persistent cache of LLM text responses, stored in the shows database.
+    A request is any string that identifies the call's inputs, e.g. the prompt itself.
+    """
+
+    def __init__(self, db: Database):
+        self.db = db
+        with db.conn as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    created_at INTEGER NOT NULL
+                ) WITHOUT ROWID
+            """)
+
+    @staticmethod
+    def make_key(model: str, request: str) -> str:
+        """Hash the prompt version, model and request into a cache key."""
+        return hashlib.sha256(f"{PROMPT_VERSION}\n{model}\n{request}".encode('utf-8')).hexdigest()
+
+    def get(self, model: str, request: str) -> Optional[str]:
+        """Return the cached response for this model and request, or None."""
+        row = self.db.conn.execute(SQL_GET_RESPONSE, (self.make_key(model, request),)).fetchone()
+        return row[0] if row else None
+
+    def set(self, model: str, request: str, response: str):
+        """Store a response for this model and request."""
+        with self.db.conn as conn:
+            conn.execute(SQL_SET_RESPONSE, (self.make_key(model, request), model, response, int(time.time())))
@@ -1,88 +1,47 @@
 import base64
+import importlib.util
 import json
+import random
+import re
+import time
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Tuple, Callable
 from pathlib import Path
-import time
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
-class LLMProvider(ABC):
-    """Base class for LLM providers."""
+_json_loads = orjson.loads if orjson else json.loads
 
-    @abstractmethod
-    def extract_books_from_image(self, image_path: str) -> List[Dict[str, Any]]:
-        """Extract book information from an image."""
-        pass
+# A reply wrapped in a markdown code fence, optionally tagged json; the
+# closing fence may be missing if the reply was cut off
+_FENCE_RE = re.compile(r"^\s*```(?:json)?\s*(.*?)\s*(?:```|$)", re.DOTALL | re.IGNORECASE)
 
-    @abstractmethod
-    def enrich_book_info(self, title: str, authors: List[str], missing_fields: Optional[List[str]] = None) -> Dict[str, Any]:
-        """Enrich book information with detailed metadata."""
-        pass
 
-    @abstractmethod
-    def match_user_categories(self, title: str, authors: List[str], synopsis: str, predefined_categories: List[str]) -> List[str]:
-        """Match book against predefined user categories."""
-        pass
+def strip_json_fence(text: str) -> str:
+    """Return the body of a markdown-fenced LLM reply, or the stripped text if unfenced."""
+    if '`' not in text:
+        return text.strip()
+    match = _FENCE_RE.match(text)
+    return match.group(1) if match else text.strip()
 
 
-class OpenAIProvider(LLMProvider):
-    def __init__(self, api_key: str, model: str = "gpt-4o"):
-        from openai import OpenAI
-        self.client = OpenAI(api_key=api_key)
-        self.model = model
+def parse_json_response(text: str) -> Any:
+    """Parse an LLM reply as JSON, ignoring a surrounding markdown code fence."""
+    return _json_loads(strip_json_fence(text))
 
-    def extract_books_from_image(self, image_path: str) -> List[Dict[str, Any]]:
-        """Extract book information from an image using GPT-4 Vision."""
-        with open(image_path, "rb") as image_file:
-            image_data = base64.b64encode(image_file.read()).decode('utf-8')
 
-        prompt = """Analyze this image of book covers or spines. Extract the title and author(s) for each book visible.
+# Prompt templates, filled in with str.format at call time
+BOOK_EXTRACT_PROMPT = """Analyze this image of book covers or spines. Extract the title and author(s) for each book visible.
 Return ONLY a JSON array in this exact format, with no additional text:
 [{"title": "Book Title", "authors": ["Author Name"]}, ...]
 
 If you cannot clearly read a book's information, skip it."""
 
-        try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": [
-                            {"type": "text", "text": prompt},
-                            {
-                                "type": "image_url",
-                                "image_url": {
-                                    "url": f"data:image/jpeg;base64,{image_data}"
-                                }
-                            }
-                        ]
-                    }
-                ],
-                max_tokens=1000
-            )
-
-            content = response.choices[0].message.content.strip()
-            # Remove markdown code blocks if present
-            if content.startswith("```"):
-                content = content.split("```")[1]
-                if content.startswith("json"):
-                    content = content[4:]
-                content = content.strip()
-
-            return json.loads(content)
-        except Exception as e:
-            print(f"Error extracting books from image: {e}")
-            return []
-
-    def enrich_book_info(self, title: str, authors: List[str], missing_fields: Optional[List[str]] = None) -> Dict[str, Any]:
-        """Enrich book information with detailed metadata."""
-        authors_str = ", ".join(authors)
-
-        if missing_fields:
-            fields_prompt = f"Provide ONLY the following information: {', '.join(missing_fields)}"
-        else:
-            fields_prompt = """Provide the following information:
+_BOOK_ALL_FIELDS_PROMPT = """Provide the following information:
 - publication_date (year or full date)
 - isbn (if available)
 - fiction_nonfiction (either "fiction" or "non-fiction")
@@ -93,7 +52,7 @@ If you cannot clearly read a book's information, skip it."""
 - awards (list of major awards won)
 - categories (list of categories like biography, classic fiction, technical, history, self-improvement, etc.)"""
 
-        prompt = f"""Provide detailed information about the book "{title}" by {authors_str}.
+_BOOK_ENRICH_PROMPT = """Provide detailed information about the book "{title}" by {authors}.
 
 {fields_prompt}
 
@@ -112,344 +71,255 @@ Return ONLY a JSON object in this exact format, with no additional text:
 
 If information is not available, use null for single values or empty arrays [] for lists."""
 
-        try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=1500
-            )
-
-            content = response.choices[0].message.content.strip()
-            # Remove markdown code blocks if present
-            if content.startswith("```"):
-                content = content.split("```")[1]
-                if content.startswith("json"):
-                    content = content[4:]
-                content = content.strip()
-
-            return json.loads(content)
-        except Exception as e:
-            print(f"Error enriching book info: {e}")
-            return {}
-
-    def match_user_categories(self, title: str, authors: List[str], synopsis: str, predefined_categories: List[str]) -> List[str]:
-        """Match book against predefined user categories."""
-        authors_str = ", ".join(authors)
-        categories_str = ", ".join([f'"{cat}"' for cat in predefined_categories])
-
-        prompt = f"""Given this book:
+_BOOK_MATCH_PROMPT = """Given this book:
 Title: {title}
-Authors: {authors_str}
+Authors: {authors}
 Synopsis: {synopsis}
 
-Which of these predefined categories does it fit into? {categories_str}
+Which of these predefined categories does it fit into? {categories}
 
 Return ONLY a JSON array of matching category names, with no additional text:
 ["category1", "category2"]
 
 Only include categories that clearly match. If no categories match, return an empty array []."""
 
-        try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=200
-            )
-
-            content = response.choices[0].message.content.strip()
-            # Remove markdown code blocks if present
-            if content.startswith("```"):
-                content = content.split("```")[1]
-                if content.startswith("json"):
-                    content = content[4:]
-                content = content.strip()
-
-            return json.loads(content)
-        except Exception as e:
-            print(f"Error matching user categories: {e}")
-            return []
 
+# Attempts per LLM call; transient failures back off 1s, 2s, ... (plus jitter) between tries.
+# The OpenAI/Anthropic clients are created with max_retries=0, so this is the only retry layer.
+RETRY_ATTEMPTS = 3
 
-class AnthropicProvider(LLMProvider):
-    def __init__(self, api_key: str, model: str = "claude-3-5-sonnet-20241022"):
-        from anthropic import Anthropic
-        self.client = Anthropic(api_key=api_key)
-        self.model = model
+# HTTP statuses worth retrying: timeouts, conflicts, rate limits and server errors
+_RETRYABLE_STATUS = {408, 409, 429}
 
-    def extract_books_from_image(self, image_path: str) -> List[Dict[str, Any]]:
-        """Extract book information from an image using Claude Vision."""
-        with open(image_path, "rb") as image_file:
-            image_data = base64.b64encode(image_file.read()).decode('utf-8')
+# Network/timeout errors from the SDKs and httpx, matched by name since the
+# SDKs are optional imports
+_RETRYABLE_ERRORS = {
+    'APIConnectionError', 'APITimeoutError', 'RateLimitError', 'InternalServerError',
+    'ServiceUnavailable', 'ResourceExhausted', 'DeadlineExceeded',
+    'TimeoutException', 'ConnectError', 'ReadTimeout', 'RemoteProtocolError',
+}
 
-        # Detect image type
-        suffix = Path(image_path).suffix.lower()
-        media_type = "image/jpeg" if suffix in [".jpg", ".jpeg"] else "image/png"
 
-        prompt = """Analyze this image of book covers or spines. Extract the title and author(s) for each book visible.
-Return ONLY a JSON array in this exact format, with no additional text:
-[{"title": "Book Title", "authors": ["Author Name"]}, ...]
+def _is_retryable(error: Exception) -> bool:
+    """True for rate limits, server errors and network failures; False for auth or bad requests."""
+    status = getattr(error, 'status_code', None)
+    if status is None:
+        status = getattr(error, 'code', None)  # google.api_core exceptions
+    if isinstance(status, int):
+        return status in _RETRYABLE_STATUS or status >= 500
+    return type(error).__name__ in _RETRYABLE_ERRORS
 
-If you cannot clearly read a book's information, skip it."""
 
+def call_with_retry(func, *args, report: Callable[[str], Any] = print, **kwargs):
+    """
+    Call an SDK function, retrying transient errors with exponential backoff.
+    Retry notices go to report, e.g. a list's append when called off the main thread.
+    """
+    for attempt in range(RETRY_ATTEMPTS):
         try:
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=1000,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": [
-                            {
-                                "type": "image",
-                                "source": {
-                                    "type": "base64",
-                                    "media_type": media_type,
-                                    "data": image_data
-                                }
-                            },
-                            {
-                                "type": "text",
-                                "text": prompt
-                            }
-                        ]
-                    }
-                ]
-            )
-
-            content = response.content[0].text.strip()
-            # Remove markdown code blocks if present
-            if content.startswith("```"):
-                content = content.split("```")[1]
-                if content.startswith("json"):
-                    content = content[4:]
-                content = content.strip()
-
-            return json.loads(content)
+            return func(*args, **kwargs)
         except Exception as e:
-            print(f"Error extracting books from image: {e}")
-            return []
+            if attempt == RETRY_ATTEMPTS - 1 or not _is_retryable(e):
+                raise
+            delay = 2 ** attempt + random.random()
+            report(f"LLM request failed ({e}), retrying in {delay:.1f}s...")
+            time.sleep(delay)
 
-    def enrich_book_info(self, title: str, authors: List[str], missing_fields: Optional[List[str]] = None) -> Dict[str, Any]:
-        """Enrich book information with detailed metadata."""
-        authors_str = ", ".join(authors)
 
-        if missing_fields:
-            fields_prompt = f"Provide ONLY the following information: {', '.join(missing_fields)}"
-        else:
-            fields_prompt = """Provide the following information:
-- publication_date (year or full date)
-- isbn (if available)
-- fiction_nonfiction (either "fiction" or "non-fiction")
-- synopsis (2-3 sentences)
-- themes (list of main themes)
-- main_characters (list of main characters if fiction, empty list if non-fiction)
-- quotes (2-3 famous or notable quotes from the book, empty list if none available)
-- awards (list of major awards won)
-- categories (list of categories like biography, classic fiction, technical, history, self-improvement, etc.)"""
+@lru_cache(maxsize=32)
+def quote_categories(categories: Tuple[str, ...]) -> str:
+    """Format a category list for a prompt, e.g. "a", "b". Cached, since the list rarely changes."""
+    return ", ".join([f'"{cat}"' for cat in categories])
 
-        prompt = f"""Provide detailed information about the book "{title}" by {authors_str}.
 
-{fields_prompt}
+def _http_client(sdk):
+    """
+    Pooled HTTP client for the openai or anthropic SDK module, or None to use the SDK default.
+    Built on the SDK's DefaultHttpxClient, so its timeouts, redirect and transport
+    settings are kept; only the pool is widened for concurrent scans, and HTTP/2 is
+    used when the h2 package is installed, so requests share TLS connections.
+    """
+    default_client = getattr(sdk, 'DefaultHttpxClient', None)
+    if default_client is None:
+        return None  # SDK too old to expose its defaults
 
-Return ONLY a JSON object in this exact format, with no additional text:
-{{
-    "publication_date": "...",
-    "isbn": "...",
-    "fiction_nonfiction": "fiction" or "non-fiction",
-    "synopsis": "...",
-    "themes": ["theme1", "theme2"],
-    "main_characters": ["character1", "character2"],
-    "quotes": ["quote1", "quote2"],
-    "awards": ["award1", "award2"],
-    "categories": ["category1", "category2"]
-}}
-
-If information is not available, use null for single values or empty arrays [] for lists."""
+    import httpx  # a dependency of both SDKs
+    return default_client(
+        http2=importlib.util.find_spec('h2') is not None,
+        limits=httpx.Limits(max_connections=50, max_keepalive_connections=50)
+    )
 
-        try:
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=1500,
-                messages=[
-                    {"role": "user", "content": prompt}
-                ]
-            )
-
-            content = response.content[0].text.strip()
-            # Remove markdown code blocks if present
-            if content.startswith("```"):
-                content = content.split("```")[1]
-                if content.startswith("json"):
-                    content = content[4:]
-                content = content.strip()
-
-            return json.loads(content)
-        except Exception as e:
-            print(f"Error enriching book info: {e}")
-            return {}
-
-    def match_user_categories(self, title: str, authors: List[str], synopsis: str, predefined_categories: List[str]) -> List[str]:
-        """Match book against predefined user categories."""
-        authors_str = ", ".join(authors)
-        categories_str = ", ".join([f'"{cat}"' for cat in predefined_categories])
-
-        prompt = f"""Given this book:
-Title: {title}
-Authors: {authors_str}
-Synopsis: {synopsis}
 
-Which of these predefined categories does it fit into? {categories_str}
+def _image_media_type(image_path: str) -> str:
+    """Guess the media type of a JPEG or PNG image from its file suffix."""
+    suffix = Path(image_path).suffix.lower()
+    return "image/jpeg" if suffix in [".jpg", ".jpeg"] else "image/png"
 
-Return ONLY a JSON array of matching category names, with no additional text:
-["category1", "category2"]
 
-Only include categories that clearly match. If no categories match, return an empty array []."""
-
-        try:
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=200,
-                messages=[
-                    {"role": "user", "content": prompt}
-                ]
-            )
-
-            content = response.content[0].text.strip()
-            # Remove markdown code blocks if present
-            if content.startswith("```"):
-                content = content.split("```")[1]
-                if content.startswith("json"):
-                    content = content[4:]
-                content = content.strip()
-
-            return json.loads(content)
-        except Exception as e:
-            print(f"Error matching user categories: {e}")
-            return []
+class LLMProvider(ABC):
+    """
+    Base class for LLM providers.
+    Subclasses implement the two raw calls, complete() and complete_with_image();
+    the prompts and response parsing are shared here.
+    """
+
+    def close(self):
+        """Close the provider's HTTP client, if it has one."""
+        client = getattr(self, 'client', None)
+        if client is not None:
+            client.close()
 
+    @abstractmethod
+    def complete(self, prompt: str, max_tokens: int) -> str:
+        """Send a text prompt and return the model's reply text."""
+        pass
 
-class GoogleProvider(LLMProvider):
-    def __init__(self, api_key: str, model: str = "gemini-2.0-flash-exp"):
-        import google.generativeai as genai
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel(model)
+    @abstractmethod
+    def complete_with_image(self, prompt: str, image_path: str, max_tokens: int) -> str:
+        """Send a prompt with one image and return the model's reply text."""
+        pass
 
     def extract_books_from_image(self, image_path: str) -> List[Dict[str, Any]]:
-        """Extract book information from an image using Gemini Vision."""
-        from PIL import Image
-
-        prompt = """Analyze this image of book covers or spines. Extract the title and author(s) for each book visible.
-Return ONLY a JSON array in this exact format, with no additional text:
-[{"title": "Book Title", "authors": ["Author Name"]}, ...]
-
-If you cannot clearly read a book's information, skip it."""
-
+        """Extract book information from an image."""
         try:
-            image = Image.open(image_path)
-            response = self.model.generate_content([prompt, image])
-
-            content = response.text.strip()
-            # Remove markdown code blocks if present
-            if content.startswith("```"):
-                content = content.split("```")[1]
-                if content.startswith("json"):
-                    content = content[4:]
-                content = content.strip()
-
-            return json.loads(content)
+            return parse_json_response(call_with_retry(self.complete_with_image, BOOK_EXTRACT_PROMPT, image_path, max_tokens=1000))
         except Exception as e:
             print(f"Error extracting books from image: {e}")
             return []
 
     def enrich_book_info(self, title: str, authors: List[str], missing_fields: Optional[List[str]] = None) -> Dict[str, Any]:
         """Enrich book information with detailed metadata."""
-        authors_str = ", ".join(authors)
-
         if missing_fields:
             fields_prompt = f"Provide ONLY the following information: {', '.join(missing_fields)}"
         else:
-            fields_prompt = """Provide the following information:
-- publication_date (year or full date)
-- isbn (if available)
-- fiction_nonfiction (either "fiction" or "non-fiction")
-- synopsis (2-3 sentences)
-- themes (list of main themes)
-- main_characters (list of main characters if fiction, empty list if non-fiction)
-- quotes (2-3 famous or notable quotes from the book, empty list if none available)
-- awards (list of major awards won)
-- categories (list of categories like biography, classic fiction, technical, history, self-improvement, etc.)"""
-
-        prompt = f"""Provide detailed information about the book "{title}" by {authors_str}.
-
-{fields_prompt}
+            fields_prompt = _BOOK_ALL_FIELDS_PROMPT
 
-Return ONLY a JSON object in this exact format, with no additional text:
-{{
-    "publication_date": "...",
-    "isbn": "...",
-    "fiction_nonfiction": "fiction" or "non-fiction",
-    "synopsis": "...",
-    "themes": ["theme1", "theme2"],
-    "main_characters": ["character1", "character2"],
-    "quotes": ["quote1", "quote2"],
-    "awards": ["award1", "award2"],
-    "categories": ["category1", "category2"]
-}}
-
-If information is not available, use null for single values or empty arrays [] for lists."""
+        prompt = _BOOK_ENRICH_PROMPT.format(title=title, authors=", ".join(authors), fields_prompt=fields_prompt)
 
         try:
-            response = self.model.generate_content(prompt)
-
-            content = response.text.strip()
-            # Remove markdown code blocks if present
-            if content.startswith("```"):
-                content = content.split("```")[1]
-                if content.startswith("json"):
-                    content = content[4:]
-                content = content.strip()
-
-            return json.loads(content)
+            return parse_json_response(call_with_retry(self.complete, prompt, max_tokens=1500))
         except Exception as e:
             print(f"Error enriching book info: {e}")
             return {}
 
     def match_user_categories(self, title: str, authors: List[str], synopsis: str, predefined_categories: List[str]) -> List[str]:
         """Match book against predefined user categories."""
-        authors_str = ", ".join(authors)
-        categories_str = ", ".join([f'"{cat}"' for cat in predefined_categories])
+        prompt = _BOOK_MATCH_PROMPT.format(
+            title=title,
+            authors=", ".join(authors),
+            synopsis=synopsis,
+            categories=quote_categories(tuple(predefined_categories))
+        )
 
-        prompt = f"""Given this book:
-Title: {title}
-Authors: {authors_str}
-Synopsis: {synopsis}
+        try:
+            return parse_json_response(call_with_retry(self.complete, prompt, max_tokens=200))
+        except Exception as e:
+            print(f"Error matching user categories: {e}")
+            return []
 
-Which of these predefined categories does it fit into? {categories_str}
 
-Return ONLY a JSON array of matching category names, with no additional text:
-["category1", "category2"]
+class OpenAIProvider(LLMProvider):
+    def __init__(self, api_key: str, model: str = "gpt-4o"):
+        import openai
+        self.client = openai.OpenAI(api_key=api_key, max_retries=0, http_client=_http_client(openai))
+        self.model = model
 
-Only include categories that clearly match. If no categories match, return an empty array []."""
+    def complete(self, prompt: str, max_tokens: int) -> str:
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "user", "content": prompt}
+            ],
+            max_tokens=max_tokens
+        )
+        return response.choices[0].message.content.strip()
 
-        try:
-            response = self.model.generate_content(prompt)
+    def complete_with_image(self, prompt: str, image_path: str, max_tokens: int) -> str:
+        with open(image_path, "rb") as image_file:
+            image_data = base64.b64encode(image_file.read()).decode('utf-8')
 
-            content = response.text.strip()
-            # Remove markdown code blocks if present
-            if content.startswith("```"):
-                content = content.split("```")[1]
-                if content.startswith("json"):
-                    content = content[4:]
-                content = content.strip()
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {
+                    "role": "user",
+                    "content": [
+                        {"type": "text", "text": prompt},
+                        {
+                            "type": "image_url",
+                            "image_url": {
+                                "url": f"data:{_image_media_type(image_path)};base64,{image_data}"
+                            }
+                        }
+                    ]
+                }
+            ],
+            max_tokens=max_tokens
+        )
+        return response.choices[0].message.content.strip()
 
-            return json.loads(content)
-        except Exception as e:
-            print(f"Error matching user categories: {e}")
-            return []
+
+class AnthropicProvider(LLMProvider):
+    def __init__(self, api_key: str, model: str = "claude-3-5-sonnet-20241022"):
+        import anthropic
+        self.client = anthropic.Anthropic(api_key=api_key, max_retries=0, http_client=_http_client(anthropic))
+        self.model = model
+
+    def complete(self, prompt: str, max_tokens: int) -> str:
+        response = self.client.messages.create(
+            model=self.model,
+            max_tokens=max_tokens,
+            messages=[
+                {"role": "user", "content": prompt}
+            ]
+        )
+        return response.content[0].text.strip()
+
+    def complete_with_image(self, prompt: str, image_path: str, max_tokens: int) -> str:
+        with open(image_path, "rb") as image_file:
+            image_data = base64.b64encode(image_file.read()).decode('utf-8')
+
+        response = self.client.messages.create(
+            model=self.model,
+            max_tokens=max_tokens,
+            messages=[
+                {
+                    "role": "user",
+                    "content": [
+                        {
+                            "type": "image",
+                            "source": {
+                                "type": "base64",
+                                "media_type": _image_media_type(image_path),
+                                "data": image_data
+                            }
+                        },
+                        {
+                            "type": "text",
+                            "text": prompt
+                        }
+                    ]
+                }
+            ]
+        )
+        return response.content[0].text.strip()
+
+
+class GoogleProvider(LLMProvider):
+    def __init__(self, api_key: str, model: str = "gemini-2.0-flash-exp"):
+        import google.generativeai as genai
+        genai.configure(api_key=api_key)
+        self.model = genai.GenerativeModel(model)
+
+    def complete(self, prompt: str, max_tokens: int) -> str:
+        response = self.model.generate_content(prompt)
+        return response.text.strip()
+
+    def complete_with_image(self, prompt: str, image_path: str, max_tokens: int) -> str:
+        from PIL import Image
+        image = Image.open(image_path)
+        response = self.model.generate_content([prompt, image])
+        return response.text.strip()
 
 
 def get_provider(config: Dict[str, Any]) -> LLMProvider:
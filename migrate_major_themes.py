@@ -7,41 +7,56 @@ import sqlite3
 import json
 from theme_categories import get_major_theme
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_json_loads = orjson.loads if orjson else json.loads
+
 DB_FILE = "shows.db"
 
 def migrate():
     conn = sqlite3.connect(DB_FILE)
-    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
     cursor = conn.cursor()
     
-    # Get all shows with themes
-    cursor.execute("SELECT id, show_name, themes FROM shows WHERE themes IS NOT NULL AND themes != '[]'")
+    # SQLite's JSON functions skip empty lists and unparseable values, so every
+    # row returned here decodes to a non-empty list
+    cursor.execute(
+        "SELECT id, show_name, themes FROM shows "
+        "WHERE json_valid(themes) AND json_type(themes) = 'array' AND json_array_length(themes) > 0"
+    )
     shows = cursor.fetchall()
     
-    updated = 0
+    # Classify in Python first, then write every match in one executemany
+    rows = []
     skipped = 0
     
-    for show in shows:
-        try:
-            themes_list = json.loads(show['themes'])
-            major_theme = get_major_theme(themes_list)
-            
-            if major_theme:
-                cursor.execute(
-                    "UPDATE shows SET major_theme = ? WHERE id = ?",
-                    (major_theme, show['id'])
-                )
-                updated += 1
-                print(f"✓ {show['show_name'][:50]:<50} → {major_theme}")
-            else:
-                skipped += 1
-                print(f"✗ {show['show_name'][:50]:<50} → No matching major theme")
-        except json.JSONDecodeError:
+    for show_id, show_name, themes in shows:
+        themes_list = [theme for theme in _json_loads(themes) if isinstance(theme, str)]
+        major_theme = get_major_theme(themes_list)
+        
+        if major_theme:
+            rows.append((major_theme, show_id))
+            print(f"✓ {show_name[:50]:<50} → {major_theme}")
+        else:
             skipped += 1
-            print(f"✗ {show['show_name'][:50]:<50} → Invalid themes JSON")
+            print(f"✗ {show_name[:50]:<50} → No matching major theme")
+    
+    cursor.execute(
+        "SELECT show_name FROM shows "
+        "WHERE themes IS NOT NULL AND themes != '' AND NOT json_valid(themes)"
+    )
+    for (show_name,) in cursor.fetchall():
+        skipped += 1
+        print(f"✗ {show_name[:50]:<50} → Invalid themes JSON")
     
-    conn.commit()
+    with conn:
+        cursor.executemany("UPDATE shows SET major_theme = ? WHERE id = ?", rows)
     conn.close()
+    updated = len(rows)
     
     print(f"\n{'='*60}")
     print(f"Migration complete!")
@@ -1,10 +1,160 @@
-import re
+import io
+import os
 import json
 import base64
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Any, List, Optional, Tuple
-from database import Database
-from llm_providers import LLMProvider
+from typing import Dict, Any, List, Optional, Tuple, Iterator, Callable
+from database import Database, normalize_name
+from llm_cache import LLMCache
+from llm_providers import LLMProvider, call_with_retry, parse_json_response, quote_categories
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+
+try:
+    import pybase64
+except ImportError:
+    pybase64 = None
+
+
+def _b64encode(data: bytes) -> str:
+    """Base64-encode image bytes to an ASCII string (SIMD-accelerated when pybase64 is installed)."""
+    if pybase64 is not None:
+        return pybase64.b64encode_as_string(data)
+    return base64.b64encode(data).decode('ascii')
+
+
+# Longest edge sent to the vision models; phone photos are downscaled to this
+MAX_IMAGE_DIM = 1536
+JPEG_QUALITY = 85
+# EXIF tag holding the camera rotation; 1 means already upright
+EXIF_ORIENTATION = 0x0112
+
+
+def _prepare_image(image_path: str) -> Tuple[bytes, str]:
+    """Read an image for a vision request as (bytes, media_type), reusing earlier reads of the same file."""
+    return _load_image(image_path, os.path.getmtime(image_path))
+
+
+# The modification time is part of the key, so an edited file is read again
+@lru_cache(maxsize=32)
+def _load_image(image_path: str, mtime: float) -> Tuple[bytes, str]:
+    """
+    Read an image for a vision request as (bytes, media_type).
+    Images larger than MAX_IMAGE_DIM, or in formats other than JPEG/PNG, are
+    downscaled and re-encoded as JPEG; small JPEG/PNG files are sent as-is.
+    """
+    if Image is None:
+        suffix = Path(image_path).suffix.lower()
+        with open(image_path, "rb") as image_file:
+            return image_file.read(), "image/jpeg" if suffix in [".jpg", ".jpeg"] else "image/png"
+
+    with Image.open(image_path) as image:
+        # Files with an EXIF rotation are re-encoded upright, since not every API applies it
+        upright = image.getexif().get(EXIF_ORIENTATION, 1) == 1
+        if max(image.size) <= MAX_IMAGE_DIM and image.format in ('JPEG', 'PNG') and upright:
+            with open(image_path, "rb") as image_file:
+                return image_file.read(), f"image/{image.format.lower()}"
+
+        # For JPEGs, decode straight at a reduced scale (still >= MAX_IMAGE_DIM) rather
+        # than materializing the full-resolution bitmap first
+        image.draft('RGB', (MAX_IMAGE_DIM, MAX_IMAGE_DIM))
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((MAX_IMAGE_DIM, MAX_IMAGE_DIM), Image.LANCZOS)
+        buffer = io.BytesIO()
+        image.convert('RGB').save(buffer, 'JPEG', quality=JPEG_QUALITY, optimize=True)
+        return buffer.getvalue(), "image/jpeg"
+
+
+# Metadata fields filled in by enrich_show
+ENRICHABLE_FIELDS = (
+    'lead_cast', 'director', 'choreographer', 'composer', 'lyricist', 'book_writer',
+    'opening_date', 'closing_date', 'is_revival', 'original_production_year', 'production_type',
+    'plot_summary', 'genre', 'tony_awards', 'other_awards',
+    'musical_numbers', 'themes', 'running_time', 'intermission_count', 'llm_categories'
+)
+
+# Shows per request in enrich_shows; each reply object is up to ~2000 tokens
+ENRICH_BATCH_SIZE = 4
+
+_ENRICH_ALL_FIELDS_PROMPT = """Provide the following information:
+- lead_cast (list of dicts with "role" and "actor" keys for main cast members)
+- director (name of director)
+- choreographer (name of choreographer, if applicable)
+- composer (name of composer, if applicable)
+- lyricist (name of lyricist, if applicable)
+- book_writer (name of book writer, if applicable)
+- opening_date (YYYY-MM-DD format)
+- closing_date (YYYY-MM-DD format or "still running")
+- is_revival (true/false)
+- original_production_year (year of original production if revival)
+- production_type ("Broadway", "Off-Broadway", "Tour", etc.)
+- plot_summary (2-3 sentences)
+- genre ("Musical", "Play", "Musical Revival", etc.)
+- tony_awards (list of Tony Awards won)
+- other_awards (list of other major awards)
+- musical_numbers (list of song titles, if applicable)
+- themes (list of main themes)
+- running_time (in minutes)
+- intermission_count (number of intermissions)
+- categories (list of auto-detected categories like "jukebox musical", "comedy", "drama", "golden age musical", etc.)"""
+
+_ENRICH_JSON_FIELDS = """    "lead_cast": [{"role": "Character Name", "actor": "Actor Name"}, ...],
+    "director": "...",
+    "choreographer": "...",
+    "composer": "...",
+    "lyricist": "...",
+    "book_writer": "...",
+    "opening_date": "YYYY-MM-DD",
+    "closing_date": "YYYY-MM-DD or still running",
+    "is_revival": true or false,
+    "original_production_year": year or null,
+    "production_type": "Broadway/Off-Broadway/Tour",
+    "plot_summary": "...",
+    "genre": "Musical/Play/etc",
+    "tony_awards": ["award1", "award2"],
+    "other_awards": ["award1", "award2"],
+    "musical_numbers": ["song1", "song2"],
+    "themes": ["theme1", "theme2"],
+    "running_time": 150,
+    "intermission_count": 1,
+    "categories": ["category1", "category2"]"""
+
+_USER_CATEGORIES_JSON_FIELD = """,
+    "user_categories": ["category1", "category2"]"""
+
+
+# Lines of format_show_display, in display order: (field, template, is_list)
+_DISPLAY_HEADER = "ID: {id}\nShow: {show_name}\nTheater: {theater_name}\nStatus: {seen_status}"
+_SUMMARY_FIELDS = (
+    ('date_attended', "Date Attended: {}", False),
+    ('rating', "Rating: {}/10", False),
+)
+_DETAIL_FIELDS = (
+    ('genre', "Genre: {}", False),
+    ('opening_date', "Opening Date: {}", False),
+    ('closing_date', "Closing Date: {}", False),
+    ('production_type', "Production Type: {}", False),
+    ('plot_summary', "Plot: {}", False),
+    ('director', "Director: {}", False),
+    ('choreographer', "Choreographer: {}", False),
+    ('composer', "Composer: {}", False),
+    ('lyricist', "Lyricist: {}", False),
+)
+_DETAIL_FIELDS_AFTER_CAST = (
+    ('tony_awards', "Tony Awards: {}", True),
+    ('other_awards', "Other Awards: {}", True),
+    ('themes', "Themes: {}", True),
+    ('running_time', "Running Time: {} minutes", False),
+    ('llm_categories', "Categories: {}", True),
+    ('user_categories', "User Categories: {}", True),
+    ('personal_notes', "Notes: {}", False),
+    ('source_image_path', "Source Image: {}", False),
+)
 
 
 class ShowManager:
@@ -12,45 +162,26 @@ class ShowManager:
         self.db = db
         self.llm_provider = llm_provider
         self.config = config
+        # Repeat enrichment/category prompts are answered from the database when enabled
+        self.cache = LLMCache(db) if config['llm'].get('cache_enabled') else None
 
     def normalize_string(self, s: str) -> str:
         """Normalize string for comparison (lowercase, remove punctuation, trim)."""
-        s = s.lower().strip()
-        s = re.sub(r'[^\w\s]', '', s)
-        s = re.sub(r'\s+', ' ', s)
-        return s
+        return normalize_name(s)
 
     def find_duplicate(self, show_name: str, theater_name: str, date_attended: Optional[str] = None) -> Optional[Dict[str, Any]]:
         """Check if show already exists using fuzzy matching."""
-        normalized_show = self.normalize_string(show_name)
-        normalized_theater = self.normalize_string(theater_name)
-
-        all_shows = self.db.get_all_shows()
-
-        for show in all_shows:
-            show_normalized = self.normalize_string(show['show_name'])
-            theater_normalized = self.normalize_string(show['theater_name'])
-
-            # Match on show name and theater name
-            if show_normalized == normalized_show and theater_normalized == normalized_theater:
-                # If date_attended is provided, check if it matches
-                if date_attended:
-                    if show.get('date_attended') == date_attended:
-                        return show
-                else:
-                    # If no date provided, consider it a duplicate if same show/theater combo exists
-                    return show
-
-        return None
+        # If date_attended is provided it must match too; otherwise any show at the
+        # same show/theater combo is a duplicate.
+        return self.db.find_by_normalized(
+            self.normalize_string(show_name),
+            self.normalize_string(theater_name),
+            date_attended or None
+        )
 
     def extract_shows_from_image(self, image_path: str) -> List[Dict[str, Any]]:
         """Extract show information from a playbill/poster image."""
-        with open(image_path, "rb") as image_file:
-            image_data = base64.b64encode(image_file.read()).decode('utf-8')
-
-        # Detect image type
-        suffix = Path(image_path).suffix.lower()
-        media_type = "image/jpeg" if suffix in [".jpg", ".jpeg"] else "image/png"
+        image_bytes, media_type = _prepare_image(image_path)
 
         prompt = """Analyze this playbill or Broadway show poster image and extract:
 1. Show name (the title of the Broadway show)
@@ -62,73 +193,8 @@ Return ONLY a JSON array in this exact format, with no additional text:
 If you cannot clearly identify the information, return an empty array []."""
 
         try:
-            # Use the provider's underlying client directly for custom prompts
-            provider_name = self.config['llm']['provider']
-
-            if provider_name == 'openai':
-                response = self.llm_provider.client.chat.completions.create(
-                    model=self.llm_provider.model,
-                    messages=[
-                        {
-                            "role": "user",
-                            "content": [
-                                {"type": "text", "text": prompt},
-                                {
-                                    "type": "image_url",
-                                    "image_url": {
-                                        "url": f"data:image/jpeg;base64,{image_data}"
-                                    }
-                                }
-                            ]
-                        }
-                    ],
-                    max_tokens=500
-                )
-                content = response.choices[0].message.content.strip()
-
-            elif provider_name == 'anthropic':
-                response = self.llm_provider.client.messages.create(
-                    model=self.llm_provider.model,
-                    max_tokens=500,
-                    messages=[
-                        {
-                            "role": "user",
-                            "content": [
-                                {
-                                    "type": "image",
-                                    "source": {
-                                        "type": "base64",
-                                        "media_type": media_type,
-                                        "data": image_data
-                                    }
-                                },
-                                {
-                                    "type": "text",
-                                    "text": prompt
-                                }
-                            ]
-                        }
-                    ]
-                )
-                content = response.content[0].text.strip()
-
-            elif provider_name == 'google':
-                from PIL import Image
-                image = Image.open(image_path)
-                response = self.llm_provider.model.generate_content([prompt, image])
-                content = response.text.strip()
-
-            else:
-                raise ValueError(f"Unknown provider: {provider_name}")
-
-            # Remove markdown code blocks if present
-            if content.startswith("```"):
-                content = content.split("```")[1]
-                if content.startswith("json"):
-                    content = content[4:]
-                content = content.strip()
-
-            return json.loads(content)
+            content = self._call_llm(prompt, max_tokens=500, image=(image_bytes, media_type))
+            return parse_json_response(content)
 
         except Exception as e:
             print(f"Error extracting shows from image: {e}")
@@ -144,238 +210,457 @@ If you cannot clearly identify the information, return an empty array []."""
         if not show:
             raise ValueError(f"Show with ID {show_id} not found")
 
-        # Determine which fields need enrichment
-        enrichable_fields = [
-            'lead_cast', 'director', 'choreographer', 'composer', 'lyricist', 'book_writer',
-            'opening_date', 'closing_date', 'is_revival', 'original_production_year', 'production_type',
-            'plot_summary', 'genre', 'tony_awards', 'other_awards',
-            'musical_numbers', 'themes', 'running_time', 'intermission_count', 'llm_categories'
-        ]
+        missing_fields = self._missing_fields(show, force)
+        if missing_fields == []:
+            return show  # Nothing to enrich
 
-        if force:
-            missing_fields = None  # Fetch all fields
-        else:
-            missing_fields = []
-            for field in enrichable_fields:
-                value = show.get(field)
-                if value is None or value == '' or (isinstance(value, list) and len(value) == 0):
-                    missing_fields.append(field)
-
-            if not missing_fields:
-                return show  # Nothing to enrich
-
-        # Call LLM for enrichment
+        # Call LLM for enrichment; the user categories are matched in the same request
         print(f"Enriching show: {show['show_name']} at {show['theater_name']}")
         enriched_data = self._enrich_show_info(
             show['show_name'],
             show['theater_name'],
-            missing_fields=missing_fields
+            missing_fields=missing_fields,
+            user_categories=self.config['settings'].get('user_categories')
+        )
+
+        return self._apply_enrichment(show, enriched_data, missing_fields, force)
+
+    def submit_enrichment(self, show_id: int, executor: Executor) -> Tuple[Optional[Future], Callable[[], Dict[str, Any]]]:
+        """
+        Start enriching a show in the background, with only the LLM request run on executor.
+        Returns the request's future (None if nothing needs fetching) and a function that
+        waits for the reply and saves it. Call that function on this thread: the cache and
+        database are only touched here, and retry notices are printed when it runs.
+        """
+        show = self.db.get_show(show_id)
+        if not show:
+            raise ValueError(f"Show with ID {show_id} not found")
+
+        missing_fields = self._missing_fields(show, False)
+        if missing_fields == []:
+            return None, lambda: show  # Nothing to enrich
+
+        user_categories = self.config['settings'].get('user_categories')
+        prompt, cache_request = self._enrichment_request(
+            show['show_name'], show['theater_name'], missing_fields, user_categories
         )
+        cached = self._get_cached_response(cache_request)
+        notices: List[str] = []
+        future = None
+        if cached is None:
+            future = executor.submit(self._call_llm, prompt, 2000, report=notices.append)
+
+        def finish() -> Dict[str, Any]:
+            enriched_data: Dict[str, Any] = {}
+            if future is None:
+                enriched_data = parse_json_response(cached)
+            else:
+                try:
+                    content = future.result()
+                    enriched_data = parse_json_response(content)
+                    self._set_cached_response(cache_request, content)
+                except Exception as e:
+                    notices.append(f"Error enriching show info: {e}")
+            for notice in notices:
+                print(notice)
+            return self._apply_enrichment(show, enriched_data, missing_fields, False)
+
+        return future, finish
+
+    def enrich_shows(self, show_ids: List[int], force: bool = False) -> List[Dict[str, Any]]:
+        """
+        Enrich several shows, asking about up to ENRICH_BATCH_SIZE shows per LLM request.
+        Shows with a cached reply skip the request, and those the batched reply
+        doesn't cover are enriched one at a time instead.
+        Returns the updated shows in the order of show_ids.
+        """
+        enriched_shows = {}
+        pending = []
+        user_categories = self.config['settings'].get('user_categories')
+
+        # A repeated ID is enriched once
+        for show_id in dict.fromkeys(show_ids):
+            show = self.db.get_show(show_id)
+            if not show:
+                raise ValueError(f"Show with ID {show_id} not found")
+
+            missing_fields = self._missing_fields(show, force)
+            if missing_fields == []:
+                enriched_shows[show_id] = show  # Nothing to enrich
+                continue
+
+            # Looked up under the same key as enrich_show, so either one fills the cache for the other
+            _, cache_request = self._enrichment_request(
+                show['show_name'], show['theater_name'], missing_fields, user_categories
+            )
+            cached = self._get_cached_response(cache_request)
+            if cached is not None:
+                enriched_shows[show_id] = self._apply_enrichment(
+                    show, parse_json_response(cached), missing_fields, force
+                )
+            else:
+                pending.append((show, missing_fields, cache_request))
+
+        batches = [pending[start:start + ENRICH_BATCH_SIZE] for start in range(0, len(pending), ENRICH_BATCH_SIZE)]
+        for batch in batches:
+            print(f"Enriching shows: {', '.join(show['show_name'] for show, _, _ in batch)}")
+
+        # The requests are independent, so they run concurrently; results are saved here in order
+        with ThreadPoolExecutor(max_workers=self.config['llm'].get('concurrency', 4)) as executor:
+            all_replies = list(executor.map(lambda batch: self._enrich_shows_info(batch, force), batches))
+
+        for batch, replies in zip(batches, all_replies):
+            for i, (show, missing_fields, cache_request) in enumerate(batch):
+                if i < len(replies) and isinstance(replies[i], dict):
+                    self._set_cached_response(cache_request, json.dumps(replies[i]))
+                    enriched_shows[show['id']] = self._apply_enrichment(show, replies[i], missing_fields, force)
+                else:
+                    enriched_shows[show['id']] = self.enrich_show(show['id'], force=force)
+
+        return [enriched_shows[show_id] for show_id in show_ids]
+
+    def _missing_fields(self, show: Dict[str, Any], force: bool) -> Optional[List[str]]:
+        """Fields to fetch for a show: None means all of them (force), [] means none."""
+        if force:
+            return None
+
+        # None, '' and [] count as missing; 0/False (e.g. is_revival) are real values
+        present = {key for key, value in show.items() if value is not None and value != '' and value != []}
+        return [field for field in ENRICHABLE_FIELDS if field not in present]
+
+    def _apply_enrichment(self, show: Dict[str, Any], enriched_data: Dict[str, Any],
+                          missing_fields: Optional[List[str]], force: bool) -> Dict[str, Any]:
+        """Save the fetched fields and matched user categories of one show, returning the updated show."""
+        predefined_categories = self.config['settings'].get('user_categories')
+        matched_categories = enriched_data.pop('user_categories', None)
 
         # Update only the fields that were fetched
         updates = {}
         for field, value in enriched_data.items():
-            if force or field in (missing_fields or enrichable_fields):
+            if force or field in (missing_fields or ENRICHABLE_FIELDS):
                 updates[field] = value
 
-        # Match against user categories if we have plot_summary
-        plot_summary = updates.get('plot_summary') or show.get('plot_summary')
-        if plot_summary and self.config['settings'].get('user_categories'):
-            print("Matching user categories...")
-            user_cats = self._match_user_categories(
-                show['show_name'],
-                show['theater_name'],
-                plot_summary,
-                self.config['settings']['user_categories']
-            )
-            updates['user_categories'] = user_cats
+        if predefined_categories and isinstance(matched_categories, list):
+            updates['user_categories'] = matched_categories
+        else:
+            # Fall back to a separate matching call if we have plot_summary
+            plot_summary = updates.get('plot_summary') or show.get('plot_summary')
+            if plot_summary and predefined_categories:
+                print("Matching user categories...")
+                user_cats = self._match_user_categories(
+                    show['show_name'],
+                    show['theater_name'],
+                    plot_summary,
+                    predefined_categories
+                )
+                updates['user_categories'] = user_cats
 
         # Update the database
         if updates:
-            self.db.update_show(show_id, updates)
+            self.db.update_show(show['id'], updates)
 
         # Return updated show
-        return self.db.get_show(show_id)
+        return self.db.get_show(show['id'])
 
-    def _enrich_show_info(self, show_name: str, theater_name: str, missing_fields: Optional[List[str]] = None) -> Dict[str, Any]:
-        """Enrich show information with detailed metadata using LLM."""
+    @staticmethod
+    def _enrichment_instructions(missing_fields: Optional[List[str]],
+                                 user_categories: Optional[List[str]]) -> Tuple[str, str]:
+        """The fields prompt and JSON object format shared by single and batched enrichment."""
         if missing_fields:
             fields_prompt = f"Provide ONLY the following information: {', '.join(missing_fields)}"
         else:
-            fields_prompt = """Provide the following information:
-- lead_cast (list of dicts with "role" and "actor" keys for main cast members)
-- director (name of director)
-- choreographer (name of choreographer, if applicable)
-- composer (name of composer, if applicable)
-- lyricist (name of lyricist, if applicable)
-- book_writer (name of book writer, if applicable)
-- opening_date (YYYY-MM-DD format)
-- closing_date (YYYY-MM-DD format or "still running")
-- is_revival (true/false)
-- original_production_year (year of original production if revival)
-- production_type ("Broadway", "Off-Broadway", "Tour", etc.)
-- plot_summary (2-3 sentences)
-- genre ("Musical", "Play", "Musical Revival", etc.)
-- tony_awards (list of Tony Awards won)
-- other_awards (list of other major awards)
-- musical_numbers (list of song titles, if applicable)
-- themes (list of main themes)
-- running_time (in minutes)
-- intermission_count (number of intermissions)
-- categories (list of auto-detected categories like "jukebox musical", "comedy", "drama", "golden age musical", etc.)"""
+            fields_prompt = _ENRICH_ALL_FIELDS_PROMPT
 
-        prompt = f"""Provide detailed information about the Broadway show "{show_name}" that played/is playing at {theater_name}.
+        json_fields = _ENRICH_JSON_FIELDS
+        if user_categories:
+            fields_prompt += (
+                f"\n\nAlso provide user_categories: which of these predefined categories the show fits into: "
+                f"{quote_categories(tuple(user_categories))}. Only include categories that clearly match."
+            )
+            json_fields += _USER_CATEGORIES_JSON_FIELD
 
-{fields_prompt}
+        return fields_prompt, f"{{\n{json_fields}\n}}"
 
-Return ONLY a JSON object in this exact format, with no additional text:
-{{
-    "lead_cast": [{{"role": "Character Name", "actor": "Actor Name"}}, ...],
-    "director": "...",
-    "choreographer": "...",
-    "composer": "...",
-    "lyricist": "...",
-    "book_writer": "...",
-    "opening_date": "YYYY-MM-DD",
-    "closing_date": "YYYY-MM-DD or still running",
-    "is_revival": true or false,
-    "original_production_year": year or null,
-    "production_type": "Broadway/Off-Broadway/Tour",
-    "plot_summary": "...",
-    "genre": "Musical/Play/etc",
-    "tony_awards": ["award1", "award2"],
-    "other_awards": ["award1", "award2"],
-    "musical_numbers": ["song1", "song2"],
-    "themes": ["theme1", "theme2"],
-    "running_time": 150,
-    "intermission_count": 1,
-    "categories": ["category1", "category2"]
-}}
+    def _enrich_shows_info(self, batch: List[Tuple[Dict[str, Any], Optional[List[str]], str]], force: bool) -> List[Any]:
+        """Ask for the metadata of several shows in one request; returns [] if the reply is unusable."""
+        if force:
+            missing_fields = None
+        else:
+            needed = set().union(*(fields for _, fields, _ in batch))
+            missing_fields = [field for field in ENRICHABLE_FIELDS if field in needed]
 
-If information is not available, use null for single values or empty arrays [] for lists."""
+        fields_prompt, json_format = self._enrichment_instructions(
+            missing_fields, self.config['settings'].get('user_categories')
+        )
+        show_list = "\n".join(
+            f'{i}. "{show["show_name"]}" that played/is playing at {show["theater_name"]}'
+            for i, (show, _, _) in enumerate(batch, 1)
+        )
 
-        try:
-            provider_name = self.config['llm']['provider']
+        # Instructions first and shows last, so repeat requests share a cacheable prefix
+        prompt = f"""Provide detailed information about each of the Broadway shows listed at the end.
 
-            if provider_name == 'openai':
-                response = self.llm_provider.client.chat.completions.create(
-                    model=self.llm_provider.model,
-                    messages=[{"role": "user", "content": prompt}],
-                    max_tokens=2000
-                )
-                content = response.choices[0].message.content.strip()
+{fields_prompt}
 
-            elif provider_name == 'anthropic':
-                response = self.llm_provider.client.messages.create(
-                    model=self.llm_provider.model,
-                    max_tokens=2000,
-                    messages=[{"role": "user", "content": prompt}]
-                )
-                content = response.content[0].text.strip()
+Return ONLY a JSON array with one object per show, in the same order as the list, with no additional text. Each object must be in this exact format:
+{json_format}
 
-            elif provider_name == 'google':
-                response = self.llm_provider.model.generate_content(prompt)
-                content = response.text.strip()
+If information is not available, use null for single values or empty arrays [] for lists.
 
-            else:
-                raise ValueError(f"Unknown provider: {provider_name}")
+Shows:
+{show_list}"""
+
+        try:
+            content = self._call_llm(prompt, max_tokens=2000 * len(batch))
+            result = parse_json_response(content)
+            return result if isinstance(result, list) and len(result) == len(batch) else []
+        except Exception as e:
+            print(f"Error enriching shows: {e}")
+            return []
 
-            # Remove markdown code blocks if present
-            if content.startswith("```"):
-                content = content.split("```")[1]
-                if content.startswith("json"):
-                    content = content[4:]
-                content = content.strip()
+    def _enrich_show_info(self, show_name: str, theater_name: str, missing_fields: Optional[List[str]] = None,
+                          user_categories: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Enrich show information with detailed metadata using LLM.
+        If user_categories is given, the response also has a "user_categories"
+        key listing which of them the show matches.
+        """
+        prompt, cache_request = self._enrichment_request(show_name, theater_name, missing_fields, user_categories)
+        cached = self._get_cached_response(cache_request)
+        if cached is not None:
+            return parse_json_response(cached)
 
-            return json.loads(content)
+        try:
+            content = self._call_llm(prompt, max_tokens=2000)
+            result = parse_json_response(content)
+            self._set_cached_response(cache_request, content)
+            return result
 
         except Exception as e:
             print(f"Error enriching show info: {e}")
             return {}
 
+    def _enrichment_request(self, show_name: str, theater_name: str, missing_fields: Optional[List[str]],
+                            user_categories: Optional[List[str]]) -> Tuple[str, str]:
+        """Build the enrichment prompt for a show and the key its reply is cached under."""
+        fields_prompt, json_format = self._enrichment_instructions(missing_fields, user_categories)
+
+        # Instructions first and the show last, so repeat requests share a cacheable prefix
+        prompt = f"""Provide detailed information about the Broadway show named at the end.
+
+{fields_prompt}
+
+Return ONLY a JSON object in this exact format, with no additional text:
+{json_format}
+
+If information is not available, use null for single values or empty arrays [] for lists.
+
+Show: "{show_name}" that played/is playing at {theater_name}"""
+
+        # Keyed on the normalized names, so "Wicked!" and "wicked" share one entry
+        cache_request = self._cache_request(
+            'enrich', show_name, theater_name, sorted(missing_fields or []), sorted(user_categories or [])
+        )
+        return prompt, cache_request
+
     def _match_user_categories(self, show_name: str, theater_name: str, plot_summary: str, predefined_categories: List[str]) -> List[str]:
         """Match show against predefined user categories."""
-        categories_str = ", ".join([f'"{cat}"' for cat in predefined_categories])
+        categories_str = quote_categories(tuple(predefined_categories))
 
-        prompt = f"""Given this Broadway show:
-Show Name: {show_name}
-Theater: {theater_name}
-Plot Summary: {plot_summary}
-
-Which of these predefined categories does it fit into? {categories_str}
+        prompt = f"""Which of these predefined categories does the Broadway show below fit into? {categories_str}
 
 Return ONLY a JSON array of matching category names, with no additional text:
 ["category1", "category2"]
 
-Only include categories that clearly match. If no categories match, return an empty array []."""
+Only include categories that clearly match. If no categories match, return an empty array [].
+
+Show Name: {show_name}
+Theater: {theater_name}
+Plot Summary: {plot_summary}"""
+
+        cache_request = self._cache_request(
+            'user_categories', show_name, theater_name, plot_summary, sorted(predefined_categories)
+        )
+        cached = self._get_cached_response(cache_request)
+        if cached is not None:
+            return parse_json_response(cached)
 
         try:
-            provider_name = self.config['llm']['provider']
+            content = self._call_llm(prompt, max_tokens=200)
+            result = parse_json_response(content)
+            self._set_cached_response(cache_request, content)
+            return result
 
-            if provider_name == 'openai':
-                response = self.llm_provider.client.chat.completions.create(
-                    model=self.llm_provider.model,
-                    messages=[{"role": "user", "content": prompt}],
-                    max_tokens=200
-                )
-                content = response.choices[0].message.content.strip()
+        except Exception as e:
+            print(f"Error matching user categories: {e}")
+            return []
 
-            elif provider_name == 'anthropic':
-                response = self.llm_provider.client.messages.create(
-                    model=self.llm_provider.model,
-                    max_tokens=200,
-                    messages=[{"role": "user", "content": prompt}]
-                )
-                content = response.content[0].text.strip()
+    def _call_llm(self, prompt: str, max_tokens: int, image: Optional[Tuple[bytes, str]] = None,
+                  report: Callable[[str], Any] = print) -> str:
+        """
+        Send a prompt, with an optional (image bytes, media type) pair, and return the reply text.
+        Every show-tracker LLM call goes through here, with retries on transient errors;
+        retry notices go to report.
+        """
+        if image is None:
+            return call_with_retry(self.llm_provider.complete, prompt, max_tokens=max_tokens, report=report)
+
+        # The providers' complete_with_image re-reads the original file, so the
+        # prepared (downscaled) image is sent through the clients directly
+        image_bytes, media_type = image
+        provider_name = self.config['llm']['provider']
+
+        # Only OpenAI and Anthropic take base64; Gemini gets the raw bytes
+        if provider_name == 'openai':
+            image_data = _b64encode(image_bytes)
+            response = call_with_retry(
+                self.llm_provider.client.chat.completions.create,
+                model=self.llm_provider.model,
+                messages=[
+                    {
+                        "role": "user",
+                        "content": [
+                            {"type": "text", "text": prompt},
+                            {
+                                "type": "image_url",
+                                "image_url": {
+                                    "url": f"data:{media_type};base64,{image_data}",
+                                    "detail": self.config['llm'].get('image_detail', 'auto')
+                                }
+                            }
+                        ]
+                    }
+                ],
+                max_tokens=max_tokens,
+                report=report
+            )
+            return response.choices[0].message.content.strip()
+
+        elif provider_name == 'anthropic':
+            image_data = _b64encode(image_bytes)
+            response = call_with_retry(
+                self.llm_provider.client.messages.create,
+                model=self.llm_provider.model,
+                max_tokens=max_tokens,
+                messages=[
+                    {
+                        "role": "user",
+                        "content": [
+                            {
+                                "type": "image",
+                                "source": {
+                                    "type": "base64",
+                                    "media_type": media_type,
+                                    "data": image_data
+                                }
+                            },
+                            {
+                                "type": "text",
+                                "text": prompt
+                            }
+                        ]
+                    }
+                ],
+                report=report
+            )
+            return response.content[0].text.strip()
 
-            elif provider_name == 'google':
-                response = self.llm_provider.model.generate_content(prompt)
-                content = response.text.strip()
+        elif provider_name == 'google':
+            response = call_with_retry(
+                self.llm_provider.model.generate_content,
+                [prompt, {"mime_type": media_type, "data": image_bytes}],
+                report=report
+            )
+            return response.text.strip()
 
-            else:
-                raise ValueError(f"Unknown provider: {provider_name}")
+        else:
+            raise ValueError(f"Unknown provider: {provider_name}")
 
-            # Remove markdown code blocks if present
-            if content.startswith("```"):
-                content = content.split("```")[1]
-                if content.startswith("json"):
-                    content = content[4:]
-                content = content.strip()
+    def _cache_model(self) -> str:
+        """Provider and model name, part of the cache key."""
+        provider_name = self.config['llm']['provider']
+        return f"{provider_name}:{self.config['llm']['model'][provider_name]}"
 
-            return json.loads(content)
+    def _cache_request(self, kind: str, show_name: str, theater_name: str, *params: Any) -> str:
+        """Describe an LLM request for the response cache by its inputs, with names normalized."""
+        return json.dumps([kind, self.normalize_string(show_name), self.normalize_string(theater_name), *params])
 
-        except Exception as e:
-            print(f"Error matching user categories: {e}")
-            return []
+    def _get_cached_response(self, request: str) -> Optional[str]:
+        """Return a cached response for this request, or None if caching is off or it misses."""
+        if self.cache is None:
+            return None
+        return self.cache.get(self._cache_model(), request)
 
-    def add_show(self, show_data: Dict[str, Any], source: str = 'manual', auto_enrich: bool = None) -> Tuple[int, str]:
+    def _set_cached_response(self, request: str, content: str):
+        """Store a successfully parsed response for this request."""
+        if self.cache is not None:
+            self.cache.set(self._cache_model(), request, content)
+
+    def add_show(self, show_data: Dict[str, Any], source: str = 'manual', auto_enrich: bool = None) -> Tuple[Optional[int], str]:
         """
         Add a new show to the database.
-        Returns (show_id, status) where status is 'added' or 'duplicate'.
+        Returns (show_id, status) where status is 'added', 'duplicate', or 'failed'
+        (with show_id None) if the show breaks a database constraint.
         """
-        # Check for duplicates
-        duplicate = self.find_duplicate(
-            show_data['show_name'],
-            show_data['theater_name'],
-            show_data.get('date_attended')
-        )
+        return self.add_shows([show_data], source=source, auto_enrich=auto_enrich)[0]
 
-        if duplicate:
-            return duplicate['id'], 'duplicate'
-
-        # Add the show
-        show_id = self.db.add_show(show_data)
+    def add_shows(self, shows: List[Dict[str, Any]], source: str = 'manual',
+                  auto_enrich: bool = None) -> List[Tuple[Optional[int], str]]:
+        """
+        Add several shows, inserting the new ones in a single transaction.
+        Returns one (show_id, status) per show, in order. A show that repeats an
+        earlier one in the same batch is a 'duplicate' of that show; one that can't
+        be saved is 'failed', and the others are still added.
+        """
+        results: List[Optional[Tuple[int, str]]] = [None] * len(shows)
+        new_shows = []
+        new_indexes = []
+        batch_duplicates = []  # (index in shows, position in new_shows)
+        # (normalized show, normalized theater) -> [(date_attended, position in new_shows)]
+        batch_keys: Dict[Tuple[str, str], List[Tuple[Optional[str], int]]] = {}
+
+        for i, show_data in enumerate(shows):
+            date_attended = show_data.get('date_attended') or None
+
+            # Check for duplicates, in the database and then earlier in this batch
+            duplicate = self.find_duplicate(show_data['show_name'], show_data['theater_name'], date_attended)
+            if duplicate:
+                results[i] = (duplicate['id'], 'duplicate')
+                continue
+
+            key = (self.normalize_string(show_data['show_name']), self.normalize_string(show_data['theater_name']))
+            matches = [position for show_date, position in batch_keys.get(key, ())
+                       if date_attended is None or show_date == date_attended]
+            if matches:
+                batch_duplicates.append((i, matches[-1]))
+                continue
+
+            batch_keys.setdefault(key, []).append((date_attended, len(new_shows)))
+            new_indexes.append(i)
+            new_shows.append(show_data)
+
+        # Add the shows; one that breaks a constraint is skipped without losing the rest
+        def report_failure(position: int, error: Exception):
+            show_data = new_shows[position]
+            print(f"Warning: Could not save {show_data['show_name']} at {show_data['theater_name']}: {error}")
+
+        new_ids = self.db.add_shows(new_shows, on_error=report_failure) if new_shows else []
+        for i, show_id in zip(new_indexes, new_ids):
+            results[i] = (show_id, 'added' if show_id is not None else 'failed')
+        for i, position in batch_duplicates:
+            results[i] = (new_ids[position], 'duplicate' if new_ids[position] is not None else 'failed')
 
         # Auto-enrich if enabled
         should_enrich = auto_enrich if auto_enrich is not None else self.config['settings'].get('auto_enrich', True)
 
         if should_enrich:
-            try:
-                self.enrich_show(show_id, force=False)
-            except Exception as e:
-                print(f"Warning: Failed to enrich show: {e}")
+            for show_id in filter(None, new_ids):
+                try:
+                    self.enrich_show(show_id, force=False)
+                except Exception as e:
+                    print(f"Warning: Failed to enrich show: {e}")
 
-        return show_id, 'added'
+        return results
 
     def update_show(self, show_id: int, updates: Dict[str, Any]):
         """Update an existing show."""
@@ -389,47 +674,17 @@ Only include categories that clearly match. If no categories match, return an em
         """Search shows with filters."""
         return self.db.search_shows(filters)
 
+    def iter_shows(self, filters: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """Search shows with filters, yielding rows as they are read."""
+        return self.db.iter_shows(filters)
+
     def format_show_display(self, show: Dict[str, Any], detailed: bool = False) -> str:
         """Format show information for display."""
-        output = []
-        output.append(f"ID: {show['id']}")
-        output.append(f"Show: {show['show_name']}")
-        output.append(f"Theater: {show['theater_name']}")
-        output.append(f"Status: {show['seen_status']}")
-
-        if show.get('date_attended'):
-            output.append(f"Date Attended: {show['date_attended']}")
-
-        if show.get('rating'):
-            output.append(f"Rating: {show['rating']}/10")
+        output = [_DISPLAY_HEADER.format_map(show)]
+        self._append_fields(output, show, _SUMMARY_FIELDS)
 
         if detailed:
-            if show.get('genre'):
-                output.append(f"Genre: {show['genre']}")
-
-            if show.get('opening_date'):
-                output.append(f"Opening Date: {show['opening_date']}")
-
-            if show.get('closing_date'):
-                output.append(f"Closing Date: {show['closing_date']}")
-
-            if show.get('production_type'):
-                output.append(f"Production Type: {show['production_type']}")
-
-            if show.get('plot_summary'):
-                output.append(f"Plot: {show['plot_summary']}")
-
-            if show.get('director'):
-                output.append(f"Director: {show['director']}")
-
-            if show.get('choreographer'):
-                output.append(f"Choreographer: {show['choreographer']}")
-
-            if show.get('composer'):
-                output.append(f"Composer: {show['composer']}")
-
-            if show.get('lyricist'):
-                output.append(f"Lyricist: {show['lyricist']}")
+            self._append_fields(output, show, _DETAIL_FIELDS)
 
             if show.get('lead_cast') and len(show['lead_cast']) > 0:
                 output.append("Lead Cast:")
@@ -439,30 +694,16 @@ Only include categories that clearly match. If no categories match, return an em
                     else:
                         output.append(f"  - {cast_member}")
 
-            if show.get('tony_awards') and len(show['tony_awards']) > 0:
-                output.append(f"Tony Awards: {', '.join(show['tony_awards'])}")
-
-            if show.get('other_awards') and len(show['other_awards']) > 0:
-                output.append(f"Other Awards: {', '.join(show['other_awards'])}")
-
-            if show.get('themes') and len(show['themes']) > 0:
-                output.append(f"Themes: {', '.join(show['themes'])}")
-
-            if show.get('running_time'):
-                output.append(f"Running Time: {show['running_time']} minutes")
-
-            if show.get('llm_categories') and len(show['llm_categories']) > 0:
-                output.append(f"Categories: {', '.join(show['llm_categories'])}")
-
-            if show.get('user_categories') and len(show['user_categories']) > 0:
-                output.append(f"User Categories: {', '.join(show['user_categories'])}")
-
-            if show.get('personal_notes'):
-                output.append(f"Notes: {show['personal_notes']}")
-
-            if show.get('source_image_path'):
-                output.append(f"Source Image: {show['source_image_path']}")
+            self._append_fields(output, show, _DETAIL_FIELDS_AFTER_CAST)
 
             output.append(f"Date Added: {show['date_added']}")
 
         return "\n".join(output)
+
+    @staticmethod
+    def _append_fields(output: List[str], show: Dict[str, Any], fields: Tuple[Tuple[str, str, bool], ...]):
+        """Append one formatted line per non-empty field; list fields are comma-joined."""
+        for key, template, is_list in fields:
+            value = show.get(key)
+            if value:
+                output.append(template.format(', '.join(value) if is_list else value))
@@ -1,10 +1,17 @@
 #!/usr/bin/env python3
+import atexit
 import click
 import yaml
 import json
 import csv
+import copy
+import os
+import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain, islice
 from pathlib import Path
-from typing import Optional
+from typing import Any, Callable, Dict, Optional, Tuple
 from datetime import datetime
 
 from database import Database
@@ -12,25 +19,148 @@ from llm_providers import get_provider
 from image_processor import ImageProcessor
 from show_manager import ShowManager
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# LibYAML's C loader/dumper when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as _YamlLoader, CSafeDumper as _YamlDumper
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader, SafeDumper as _YamlDumper
+
+
+# Parsed config.yaml per path, with the (mtime_ns, size) it was parsed at
+_CONFIG_CACHE: Dict[Path, Tuple[int, int, Dict[str, Any]]] = {}
+
 
 def load_config():
-    """Load configuration from config.yaml."""
+    """Load configuration from config.yaml, reparsing only when the file has changed."""
     config_path = Path(__file__).parent / "config.yaml"
-    if not config_path.exists():
+    try:
+        st = config_path.stat()
+    except FileNotFoundError:
         raise FileNotFoundError(f"Configuration file not found: {config_path}")
 
-    with open(config_path, 'r') as f:
-        return yaml.safe_load(f)
+    cached = _CONFIG_CACHE.get(config_path)
+    if cached is None or cached[:2] != (st.st_mtime_ns, st.st_size):
+        config = _read_config_sidecar(config_path, st)
+        if config is None:
+            with open(config_path, 'r') as f:
+                config = yaml.load(f, Loader=_YamlLoader)
+            _write_config_sidecar(config_path, st, config)
+        cached = (st.st_mtime_ns, st.st_size, config)
+        _CONFIG_CACHE[config_path] = cached
+
+    # Callers modify their copy (e.g. categories add), so never hand out the cached dict
+    return copy.deepcopy(cached[2])
 
 
 def save_config(config):
-    """Save configuration to config.yaml."""
+    """Save configuration to config.yaml, replacing the file atomically."""
     config_path = Path(__file__).parent / "config.yaml"
-    with open(config_path, 'w') as f:
-        yaml.dump(config, f, default_flow_style=False, sort_keys=False)
+    tmp_path = config_path.with_name(config_path.name + ".tmp")
+    try:
+        mode = config_path.stat().st_mode & 0o777
+    except FileNotFoundError:
+        mode = 0o600
+
+    # Write the new YAML next to the old file, then swap it in, so an
+    # interrupted save never leaves a truncated config.yaml behind
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, mode)
+    try:
+        with os.fdopen(fd, 'w') as f:
+            yaml.dump(config, f, Dumper=_YamlDumper, default_flow_style=False, sort_keys=False)
+        os.replace(tmp_path, config_path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+    _CONFIG_CACHE.pop(config_path, None)
+    reset_managers()
+    try:
+        os.remove(_config_sidecar_path(config_path))
+    except FileNotFoundError:
+        pass
+
+
+def mutate_config(mutator: Callable[[Dict[str, Any]], bool]) -> bool:
+    """
+    Load the config, apply mutator to it in place and save it if mutator returns True.
+    Returns what mutator returned, so callers can report a no-op.
+    """
+    config = load_config()
+    changed = mutator(config)
+    if changed:
+        save_config(config)
+    return changed
+
+
+def _config_sidecar_path(config_path: Path) -> Path:
+    """The JSON copy of the parsed config kept next to config.yaml."""
+    return config_path.with_name(config_path.name + ".cache.json")
+
+
+def _read_config_sidecar(config_path: Path, st: os.stat_result) -> Optional[Dict[str, Any]]:
+    """Return the sidecar's config if it was written from this version of config.yaml, else None."""
+    try:
+        with open(_config_sidecar_path(config_path), 'r') as f:
+            sidecar = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if sidecar.get('source') != [st.st_mtime_ns, st.st_size]:
+        return None
+    return sidecar.get('config')
+
+
+def _write_config_sidecar(config_path: Path, st: os.stat_result, config: Dict[str, Any]):
+    """Save the parsed config as JSON so the next process can skip the YAML parse."""
+    try:
+        data = json.dumps({'source': [st.st_mtime_ns, st.st_size], 'config': config})
+    except (TypeError, ValueError):
+        return  # YAML-only types (dates etc.); keep parsing the YAML
+    if json.loads(data)['config'] != config:
+        return  # e.g. non-string keys, which JSON would turn into strings
+
+    sidecar_path = _config_sidecar_path(config_path)
+    tmp_path = sidecar_path.with_name(sidecar_path.name + ".tmp")
+    try:
+        # The config holds API keys, so the copy is readable by the owner only
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as f:
+            f.write(data)
+        os.replace(tmp_path, sidecar_path)
+    except OSError:
+        pass  # The sidecar is only an optimization
+
+
+# (config, db, llm_provider, show_manager), created by the first get_managers() call
+_managers = None
 
 
 def get_managers():
+    """Return database, LLM provider, and show manager, initializing them on first use."""
+    global _managers
+    if _managers is None:
+        _managers = _create_managers()
+    return _managers
+
+
+def reset_managers():
+    """Close the database and LLM client and forget the managers, e.g. after the config changed."""
+    global _managers
+    if _managers is not None:
+        _managers[1].close()
+        _managers[2].close()
+        _managers = None
+
+
+atexit.register(reset_managers)
+
+
+def _create_managers():
     """Initialize and return database, LLM provider, and show manager."""
     config = load_config()
 
@@ -49,16 +179,75 @@ def get_managers():
     return config, db, llm_provider, show_manager
 
 
+def _json_record(show: Dict[str, Any]) -> bytes:
+    """One show as indented JSON, serialized with orjson when it is installed."""
+    if orjson:
+        return orjson.dumps(show, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(show, indent=2).encode('utf-8')
+
+
+# The YYYY-MM-DD form the date prompts and options ask for
+_ISO_DATE_RE = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+
+
+def _is_iso_date(value: str) -> bool:
+    """Whether value is a real calendar date written as YYYY-MM-DD."""
+    if not _ISO_DATE_RE.match(value):
+        return False
+    try:
+        datetime.fromisoformat(value)  # rejects e.g. 2024-02-30
+    except ValueError:
+        return False
+    return True
+
+
+# Columns of the CSV export, in order
+CSV_EXPORT_FIELDS = (
+    'id', 'show_name', 'theater_name', 'seen_status', 'date_attended',
+    'rating', 'date_added', 'personal_notes', 'lead_cast', 'director',
+    'choreographer', 'composer', 'lyricist', 'book_writer', 'opening_date',
+    'closing_date', 'is_revival', 'original_production_year', 'production_type',
+    'plot_summary', 'genre', 'tony_awards', 'other_awards', 'musical_numbers',
+    'themes', 'running_time', 'intermission_count', 'llm_categories',
+    'user_categories', 'source_image_path', 'last_updated',
+)
+
+
+def _csv_value(field: str, value: Any) -> Any:
+    """Flatten a list field into one CSV cell; other values are written as-is."""
+    if not isinstance(value, list):
+        return value
+    if field == 'lead_cast':
+        # Special handling for lead_cast dicts
+        return '; '.join(f"{c.get('role', '')}: {c.get('actor', '')}" for c in value if isinstance(c, dict))
+    return ', '.join(map(str, value))
+
+
 @click.group()
-def cli():
+@click.option('--profile', 'profile_path', type=click.Path(dir_okay=False),
+              help='Profile the command and write cProfile stats to this file')
+@click.pass_context
+def cli(ctx, profile_path):
     """Broadway Show Tracker - Track your Broadway shows with AI-powered metadata."""
-    pass
+    if profile_path:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+        def write_profile():
+            profiler.disable()
+            profiler.dump_stats(profile_path)
+            click.echo(f"Profile written to {profile_path}", err=True)
+
+        ctx.call_on_close(write_profile)
 
 
 @cli.command()
 @click.option('--directory', type=click.Choice(['shows_seen', 'shows_wishlist', 'all']), default='all',
               help='Directory to scan for images')
-def scan(directory):
+@click.option('--noninteractive', is_flag=True,
+              help='Skip the date/rating/notes prompts for seen shows (fill them in later with update)')
+def scan(directory, noninteractive):
     """Scan directories for playbill/poster images and extract information."""
     config, db, llm_provider, show_manager = get_managers()
     image_processor = ImageProcessor(config, db)
@@ -71,85 +260,123 @@ def scan(directory):
 
     total_shows_added = 0
 
-    for dir_name in directories:
-        click.echo(f"\nScanning directory: {dir_name}")
-        unprocessed_images = image_processor.scan_directory(dir_name)
-
-        if not unprocessed_images:
-            click.echo(f"No new images found in {dir_name}")
-            continue
-
-        click.echo(f"Found {len(unprocessed_images)} unprocessed image(s)")
+    # New shows' LLM requests run in the background so the next prompt doesn't wait on them;
+    # the replies are saved, and any notices printed, on this thread once the prompts are done
+    auto_enrich = config['settings'].get('auto_enrich', True)
+    concurrency = config['llm'].get('concurrency', 4)
+    enrich_executor = ThreadPoolExecutor(max_workers=concurrency)
+    enrichments = []
 
-        for image_path in unprocessed_images:
-            click.echo(f"\nProcessing: {Path(image_path).name}")
+    # Vision calls are network-bound, so up to two per worker run ahead of the
+    # prompts below, which still go one image at a time, in scan order
+    extract_executor = ThreadPoolExecutor(max_workers=concurrency)
+    extractions = deque()
 
-            try:
-                # Extract shows from image
-                shows = show_manager.extract_shows_from_image(image_path)
-
-                if not shows:
-                    click.echo("  No shows detected in image")
-                    db.mark_image_processed(image_path, 0)
-                    continue
-
-                click.echo(f"  Detected {len(shows)} show(s)")
-
-                # Determine seen status from directory
-                seen_status = image_processor.get_seen_status_from_directory(image_path)
-
-                shows_added = 0
-                for show_data in shows:
-                    show_name = show_data['show_name']
-                    theater_name = show_data['theater_name']
-
-                    click.echo(f"  - {show_name} at {theater_name}")
-
-                    # Prepare show data
-                    show_entry = {
-                        'show_name': show_name,
-                        'theater_name': theater_name,
-                        'seen_status': seen_status,
-                        'source_image_path': image_path
-                    }
-
-                    # If seen, prompt for date attended and rating
-                    if seen_status == 'seen':
-                        date_attended = click.prompt("    Date attended (YYYY-MM-DD or leave empty)",
-                                                    type=str, default='', show_default=False)
-                        if date_attended:
-                            try:
-                                # Validate date format
-                                datetime.fromisoformat(date_attended)
-                                show_entry['date_attended'] = date_attended
-                            except ValueError:
-                                click.echo("    Invalid date format, skipping date")
-
-                        rating = click.prompt("    Rate this show (1-10, or 0 to skip)", type=int, default=0)
-                        if rating > 0:
-                            show_entry['rating'] = rating
-
-                        notes = click.prompt("    Personal notes (or leave empty)", type=str, default='', show_default=False)
-                        if notes:
-                            show_entry['personal_notes'] = notes
+    try:
+        for dir_name in directories:
+            click.echo(f"\nScanning directory: {dir_name}")
+            unprocessed_images = image_processor.scan_directory(dir_name)
 
-                    # Add show
-                    show_id, status = show_manager.add_show(show_entry)
+            if not unprocessed_images:
+                click.echo(f"No new images found in {dir_name}")
+                continue
 
-                    if status == 'duplicate':
-                        click.echo(f"    Already in database (ID: {show_id})")
-                    elif status == 'added':
-                        click.echo(f"    Added to database (ID: {show_id})")
-                        shows_added += 1
+            click.echo(f"Found {len(unprocessed_images)} unprocessed image(s)")
 
-                total_shows_added += shows_added
+            upcoming = iter(unprocessed_images)
+            for image_path in unprocessed_images:
+                for next_path in islice(upcoming, concurrency * 2 - len(extractions)):
+                    extractions.append(extract_executor.submit(show_manager.extract_shows_from_image, next_path))
+                extraction = extractions.popleft()
+                click.echo(f"\nProcessing: {Path(image_path).name}")
 
-                # Mark image as processed
-                db.mark_image_processed(image_path, shows_added)
+                try:
+                    # Extract shows from image
+                    shows = extraction.result()
+
+                    if not shows:
+                        click.echo("  No shows detected in image")
+                        db.mark_image_processed(image_path, 0)
+                        continue
+
+                    click.echo(f"  Detected {len(shows)} show(s)")
+
+                    # Determine seen status from directory
+                    seen_status = image_processor.get_seen_status_from_directory(image_path)
+
+                    # Answers are collected for every show first, then saved in one transaction
+                    show_entries = []
+                    for show_data in shows:
+                        show_name = show_data['show_name']
+                        theater_name = show_data['theater_name']
+
+                        click.echo(f"  - {show_name} at {theater_name}")
+
+                        # Prepare show data
+                        show_entry = {
+                            'show_name': show_name,
+                            'theater_name': theater_name,
+                            'seen_status': seen_status,
+                            'source_image_path': image_path
+                        }
+
+                        # If seen, prompt for date attended and rating
+                        if seen_status == 'seen' and not noninteractive:
+                            date_attended = click.prompt("    Date attended (YYYY-MM-DD or leave empty)",
+                                                        type=str, default='', show_default=False)
+                            if date_attended:
+                                if _is_iso_date(date_attended):
+                                    show_entry['date_attended'] = date_attended
+                                else:
+                                    click.echo("    Invalid date format, skipping date")
+
+                            rating = click.prompt("    Rate this show (1-10, or 0 to skip)", type=int, default=0)
+                            if rating > 0:
+                                show_entry['rating'] = rating
+
+                            notes = click.prompt("    Personal notes (or leave empty)", type=str, default='', show_default=False)
+                            if notes:
+                                show_entry['personal_notes'] = notes
+
+                        show_entries.append(show_entry)
+
+                    # Add shows
+                    shows_added = 0
+                    results = show_manager.add_shows(show_entries, auto_enrich=False)
+                    for show_entry, (show_id, status) in zip(show_entries, results):
+                        if status == 'duplicate':
+                            click.echo(f"  {show_entry['show_name']}: Already in database (ID: {show_id})")
+                        elif status == 'added':
+                            click.echo(f"  {show_entry['show_name']}: Added to database (ID: {show_id})")
+                            shows_added += 1
+                            if auto_enrich:
+                                enrichments.append(show_manager.submit_enrichment(show_id, enrich_executor))
+
+                    total_shows_added += shows_added
+
+                    # Mark image as processed
+                    db.mark_image_processed(image_path, shows_added)
+
+                except Exception as e:
+                    click.echo(f"  Error processing image: {e}", err=True)
+                    continue
 
+        if enrichments:
+            click.echo(f"\nFinishing metadata enrichment for {len(enrichments)} show(s)...")
+        for _, finish in enrichments:
+            try:
+                finish()
             except Exception as e:
-                click.echo(f"  Error processing image: {e}", err=True)
-                continue
+                click.echo(f"Warning: Failed to enrich show: {e}", err=True)
+    finally:
+        # On Ctrl-C, drop the queued requests rather than waiting for them
+        for future in extractions:
+            future.cancel()
+        for future, _ in enrichments:
+            if future is not None:
+                future.cancel()
+        extract_executor.shutdown(wait=False)
+        enrich_executor.shutdown(wait=False)
 
     click.echo(f"\n✓ Scan complete. Added {total_shows_added} new show(s).")
 
@@ -181,20 +408,17 @@ def add(show_name, theater_name, seen, wishlist, date_attended, rating, notes):
 
     if seen_status == 'seen':
         if date_attended:
-            try:
-                datetime.fromisoformat(date_attended)
-                show_data['date_attended'] = date_attended
-            except ValueError:
+            if not _is_iso_date(date_attended):
                 click.echo("Invalid date format. Use YYYY-MM-DD", err=True)
                 raise click.Abort()
+            show_data['date_attended'] = date_attended
         else:
             date_input = click.prompt("Date attended (YYYY-MM-DD or leave empty)",
                                      type=str, default='', show_default=False)
             if date_input:
-                try:
-                    datetime.fromisoformat(date_input)
+                if _is_iso_date(date_input):
                     show_data['date_attended'] = date_input
-                except ValueError:
+                else:
                     click.echo("Invalid date format, proceeding without date")
 
         if rating:
@@ -226,6 +450,8 @@ def add(show_name, theater_name, seen, wishlist, date_attended, rating, notes):
                     click.echo("✓ Show updated")
         elif status == 'added':
             click.echo(f"✓ Show added successfully (ID: {show_id})")
+        elif status == 'failed':
+            raise ValueError("the show could not be saved")
 
     except Exception as e:
         click.echo(f"Error adding show: {e}", err=True)
@@ -233,11 +459,11 @@ def add(show_name, theater_name, seen, wishlist, date_attended, rating, notes):
 
 
 @cli.command()
-@click.option('--name', help='Filter by show name (partial match)')
-@click.option('--theater', help='Filter by theater (partial match)')
+@click.option('--name', help='Filter by show name (matches word prefixes)')
+@click.option('--theater', help='Filter by theater (matches word prefixes)')
 @click.option('--seen', is_flag=True, help='Show only seen shows')
 @click.option('--wishlist', is_flag=True, help='Show only wishlist shows')
-@click.option('--genre', help='Filter by genre')
+@click.option('--genre', help='Filter by genre (matches word prefixes)')
 @click.option('--category', help='Filter by LLM category')
 @click.option('--user-category', help='Filter by user category')
 @click.option('--rating-min', type=click.IntRange(1, 10), help='Minimum rating')
@@ -355,12 +581,10 @@ def update(show_id, rating, notes, date_attended, seen, wishlist):
     if notes:
         updates['personal_notes'] = notes
     if date_attended:
-        try:
-            datetime.fromisoformat(date_attended)
-            updates['date_attended'] = date_attended
-        except ValueError:
+        if not _is_iso_date(date_attended):
             click.echo("Invalid date format. Use YYYY-MM-DD", err=True)
             raise click.Abort()
+        updates['date_attended'] = date_attended
     if seen:
         updates['seen_status'] = 'seen'
     elif wishlist:
@@ -375,17 +599,16 @@ def update(show_id, rating, notes, date_attended, seen, wishlist):
 
 
 @cli.command()
-@click.argument('show_id', type=int)
+@click.argument('show_ids', type=int, nargs=-1, required=True)
 @click.option('--force', is_flag=True, help='Re-fetch all fields, overwriting existing data')
-def enrich(show_id, force):
-    """Enrich a show with detailed metadata from LLM."""
+def enrich(show_ids, force):
+    """Enrich one or more shows with detailed metadata from LLM."""
     config, db, llm_provider, show_manager = get_managers()
 
-    show_data = show_manager.get_show(show_id)
-
-    if not show_data:
-        click.echo(f"Show not found: {show_id}", err=True)
-        raise click.Abort()
+    for show_id in show_ids:
+        if not show_manager.get_show(show_id):
+            click.echo(f"Show not found: {show_id}", err=True)
+            raise click.Abort()
 
     try:
         if force:
@@ -393,9 +616,15 @@ def enrich(show_id, force):
         else:
             click.echo("Fetching missing metadata fields...")
 
-        updated_show = show_manager.enrich_show(show_id, force=force)
-        click.echo("✓ Show enriched successfully\n")
-        click.echo(show_manager.format_show_display(updated_show, detailed=True))
+        # Several shows are sent to the LLM together in batches
+        if len(show_ids) == 1:
+            updated_shows = [show_manager.enrich_show(show_ids[0], force=force)]
+        else:
+            updated_shows = show_manager.enrich_shows(list(show_ids), force=force)
+
+        for i, updated_show in enumerate(updated_shows):
+            click.echo(("\n" if i else "") + "✓ Show enriched successfully\n")
+            click.echo(show_manager.format_show_display(updated_show, detailed=True))
 
     except Exception as e:
         click.echo(f"Error enriching show: {e}", err=True)
@@ -409,45 +638,37 @@ def export(output_format, output):
     """Export all shows to CSV or JSON."""
     config, db, llm_provider, show_manager = get_managers()
 
-    shows = show_manager.search_shows({})
+    # Rows are streamed to the file rather than loaded into one list first
+    rows = show_manager.iter_shows({})
+    first = next(rows, None)
 
-    if not shows:
+    if first is None:
         click.echo("No shows to export.")
         return
 
+    shows = chain([first], rows)
+    count = 0
+
     try:
         if output_format == 'json':
-            with open(output, 'w') as f:
-                json.dump(shows, f, indent=2)
+            with open(output, 'wb') as f:
+                # Same layout as json.dump(list, indent=2), one record at a time
+                f.write(b'[')
+                for show in shows:
+                    f.write(b',\n  ' if count else b'\n  ')
+                    f.write(_json_record(show).replace(b'\n', b'\n  '))
+                    count += 1
+                f.write(b'\n]')
         elif output_format == 'csv':
             with open(output, 'w', newline='') as f:
-                # Get all possible fields
-                fieldnames = ['id', 'show_name', 'theater_name', 'seen_status', 'date_attended',
-                              'rating', 'date_added', 'personal_notes', 'lead_cast', 'director',
-                              'choreographer', 'composer', 'lyricist', 'book_writer', 'opening_date',
-                              'closing_date', 'is_revival', 'original_production_year', 'production_type',
-                              'plot_summary', 'genre', 'tony_awards', 'other_awards', 'musical_numbers',
-                              'themes', 'running_time', 'intermission_count', 'llm_categories',
-                              'user_categories', 'source_image_path', 'last_updated']
-
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
-                writer.writeheader()
+                writer = csv.writer(f)
+                writer.writerow(CSV_EXPORT_FIELDS)
 
                 for show in shows:
-                    # Convert lists to comma-separated strings for CSV
-                    row = show.copy()
-                    for field in ['lead_cast', 'tony_awards', 'other_awards', 'musical_numbers',
-                                  'themes', 'llm_categories', 'user_categories']:
-                        if isinstance(row.get(field), list):
-                            if field == 'lead_cast':
-                                # Special handling for lead_cast dicts
-                                row[field] = '; '.join([f"{c.get('role', '')}: {c.get('actor', '')}"
-                                                       for c in row[field] if isinstance(c, dict)])
-                            else:
-                                row[field] = ', '.join([str(item) for item in row[field]])
-                    writer.writerow(row)
-
-        click.echo(f"✓ Exported {len(shows)} show(s) to {output}")
+                    count += 1
+                    writer.writerow([_csv_value(field, show.get(field)) for field in CSV_EXPORT_FIELDS])
+
+        click.echo(f"✓ Exported {count} show(s) to {output}")
 
     except Exception as e:
         click.echo(f"Error exporting shows: {e}", err=True)
@@ -480,8 +701,6 @@ def list_categories():
 @click.argument('category')
 def add_category(category):
     """Add a new predefined user category."""
-    config = load_config()
-
     # Normalize category (lowercase, trim)
     category = category.lower().strip()
 
@@ -489,17 +708,19 @@ def add_category(category):
         click.echo("Category name cannot be empty.", err=True)
         raise click.Abort()
 
-    user_categories = config['settings'].get('user_categories', [])
+    def add(config):
+        # Ordered set: keeps the listed order and drops any duplicates already saved
+        user_categories = dict.fromkeys(config['settings'].get('user_categories') or [])
+        if category in user_categories:
+            return False
+        user_categories[category] = None
+        config['settings']['user_categories'] = list(user_categories)
+        return True
 
-    if category in user_categories:
+    if not mutate_config(add):
         click.echo(f"Category '{category}' already exists.")
         return
 
-    user_categories.append(category)
-    config['settings']['user_categories'] = user_categories
-
-    save_config(config)
-
     click.echo(f"✓ Added category: {category}")
 
 
@@ -507,20 +728,20 @@ def add_category(category):
 @click.argument('category')
 def remove_category(category):
     """Remove a predefined user category."""
-    config = load_config()
-
     category = category.lower().strip()
-    user_categories = config['settings'].get('user_categories', [])
 
-    if category not in user_categories:
+    def remove(config):
+        user_categories = dict.fromkeys(config['settings'].get('user_categories') or [])
+        if category not in user_categories:
+            return False
+        del user_categories[category]
+        config['settings']['user_categories'] = list(user_categories)
+        return True
+
+    if not mutate_config(remove):
         click.echo(f"Category '{category}' not found.")
         return
 
-    user_categories.remove(category)
-    config['settings']['user_categories'] = user_categories
-
-    save_config(config)
-
     click.echo(f"✓ Removed category: {category}")
 
 
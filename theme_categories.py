@@ -3,6 +3,8 @@ Theme to Major Theme Category Mapping for Broadway Shows
 Uses the same major categories as books for consistency.
 """
 
+from functools import lru_cache
+
 # Major theme categories (same as books)
 MAJOR_THEMES = [
     "Human Condition & Emotions",
@@ -145,6 +147,25 @@ THEME_TO_MAJOR = {
 }
 
 
+# Position of each major theme in MAJOR_THEMES
+MAJOR_INDEX = {major: i for i, major in enumerate(MAJOR_THEMES)}
+
+# The show themes grouped under each major theme
+MAJOR_TO_THEMES = {major: [] for major in MAJOR_THEMES}
+for _theme, _major in THEME_TO_MAJOR.items():
+    MAJOR_TO_THEMES[_major].append(_theme)
+del _theme, _major
+
+# Lookup table keyed the way get_major_theme normalizes its input
+_THEME_TO_INDEX = {theme.lower().strip(): MAJOR_INDEX[major] for theme, major in THEME_TO_MAJOR.items()}
+
+
+@lru_cache(maxsize=512)
+def _normalize_theme(theme):
+    # Shows draw on a small vocabulary of themes, so this is nearly always a cache hit
+    return theme.lower().strip()
+
+
 def get_major_theme(themes_list):
     """
     Given a list of themes, determine the most appropriate major theme.
@@ -153,32 +174,32 @@ def get_major_theme(themes_list):
     if not themes_list:
         return None
     
-    # Count occurrences of each major theme
-    major_counts = {}
+    # Count occurrences of each major theme, by index into MAJOR_THEMES
+    counts = [0] * len(MAJOR_THEMES)
+    first_seen = []
+    lookup = _THEME_TO_INDEX.get
     for theme in themes_list:
-        theme_lower = theme.lower().strip()
-        if theme_lower in THEME_TO_MAJOR:
-            major = THEME_TO_MAJOR[theme_lower]
-            major_counts[major] = major_counts.get(major, 0) + 1
+        i = lookup(_normalize_theme(theme))
+        if i is not None:
+            if not counts[i]:
+                first_seen.append(i)
+            counts[i] += 1
     
-    if not major_counts:
+    if not first_seen:
         return None
     
-    # Return the major theme with the highest count
-    return max(major_counts, key=major_counts.get)
+    # Return the major theme with the highest count (the first one seen on ties)
+    return MAJOR_THEMES[max(first_seen, key=counts.__getitem__)]
 
 
 def get_all_major_themes(themes_list):
     """
-    Given a list of themes, return all unique major themes.
+    Given a list of themes, return all unique major themes, in MAJOR_THEMES order.
     """
     if not themes_list:
         return []
     
-    majors = set()
-    for theme in themes_list:
-        theme_lower = theme.lower().strip()
-        if theme_lower in THEME_TO_MAJOR:
-            majors.add(THEME_TO_MAJOR[theme_lower])
+    lookup = _THEME_TO_INDEX.get
+    indexes = {i for theme in themes_list if (i := lookup(_normalize_theme(theme))) is not None}
     
-    return sorted(majors)
+    return [MAJOR_THEMES[i] for i in sorted(indexes)]